@@ -1,6 +1,10 @@
 from flask import Flask, jsonify
 from flask_cors import CORS
-from database import close_db, init_db
+from database import close_db, init_db, ping
+from commands import register_commands
+from json_provider import MongoJSONProvider
+from profiling import init_profiling
+from request_metrics import init_request_metrics
 import os
 
 # Import all routes
@@ -13,6 +17,11 @@ from routes.audit_routes import audit_bp
 from routes.compliance_routes import compliance_bp
 from routes.inventory_routes import inventory_bp
 from routes.report_routes import report_bp
+from routes.diagnostic_routes import diagnostic_bp
+from routes.metrics_routes import metrics_bp
+from routes.sync_routes import sync_bp
+from routes.event_routes import event_bp
+from routes.search_routes import search_bp
 
 def create_app():
     app = Flask(__name__)
@@ -20,6 +29,9 @@ def create_app():
     # Configuration
     app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key-hyundai-cmms')
     
+    # Encode ObjectId/datetime natively (orjson when installed)
+    app.json = MongoJSONProvider(app)
+    
     # Enable CORS for Next.js frontend
     CORS(app, origins=['http://localhost:3000', 'http://nextjs:3000'])
     
@@ -33,6 +45,20 @@ def create_app():
     app.register_blueprint(compliance_bp)
     app.register_blueprint(inventory_bp)
     app.register_blueprint(report_bp)
+    app.register_blueprint(diagnostic_bp)
+    app.register_blueprint(metrics_bp)
+    app.register_blueprint(sync_bp)
+    app.register_blueprint(event_bp)
+    app.register_blueprint(search_bp)
+    
+    # Request latency, in-flight and error metrics
+    init_request_metrics(app)
+    
+    # Per-request MongoDB profiling (Server-Timing, metrics, slow log)
+    init_profiling(app)
+    
+    # Register CLI commands
+    register_commands(app)
     
     # Register teardown function
     app.teardown_appcontext(close_db)
@@ -40,7 +66,16 @@ def create_app():
     # Health check endpoint
     @app.route('/health', methods=['GET'])
     def health_check():
-        return jsonify({'status': 'healthy', 'service': 'Hyundai CMMS API'}), 200
+        try:
+            ping(float(os.getenv('HEALTH_CHECK_TIMEOUT', '2')))
+        except Exception as e:
+            return jsonify({
+                'status': 'unhealthy',
+                'service': 'Hyundai CMMS API',
+                'database': 'unreachable',
+                'error': str(e)
+            }), 503
+        return jsonify({'status': 'healthy', 'service': 'Hyundai CMMS API', 'database': 'ok'}), 200
     
     # Root endpoint
     @app.route('/', methods=['GET'])
@@ -57,7 +92,12 @@ def create_app():
                 'audits': '/api/audits',
                 'compliance': '/api/compliance',
                 'inventory': '/api/inventory',
-                'reports': '/api/reports'
+                'reports': '/api/reports',
+                'sync': '/api/sync',
+                'events': '/api/events/stream',
+                'search': '/api/search',
+                'diagnostics': '/api/diagnostics',
+                'metrics': '/metrics'
             }
         }), 200
     
@@ -70,5 +110,5 @@ if __name__ == '__main__':
     with app.app_context():
         init_db()
     
-    # Run the app
-    app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
+    # Development server only; production runs gunicorn -c gunicorn_config.py wsgi:app
+    app.run(host='0.0.0.0', port=5000, debug=os.getenv('FLASK_DEBUG', '').lower() in ('1', 'true', 'yes'))
\ No newline at end of file
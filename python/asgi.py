@@ -0,0 +1,4 @@
+"""ASGI entry point untuk varian async: GUNICORN_MODE=asgi gunicorn -c gunicorn_config.py asgi:app"""
+from async_app import create_async_app
+
+app = create_async_app()
@@ -0,0 +1,185 @@
+"""Varian async (ASGI) untuk endpoint list dan laporan yang I/O-bound
+
+Memakai Quart (API yang sama dengan Flask) dan AsyncMongoClient dari
+pymongo, sehingga satu worker bisa melayani banyak query lambat sekaligus
+tanpa satu thread per request. Pipeline, pagination, format respons dan
+ETag/304 list endpoint memakai helper yang sama dengan app Flask, jadi
+reverse proxy bisa mengarahkan path ini ke server ASGI.
+
+Yang tidak ada di sini: export streaming (stream=ndjson|json atau Accept:
+application/x-ndjson) pada work orders dan laporan hanya dilayani app
+Flask; di sini parameter itu diabaikan dan respons berupa satu body JSON.
+
+Jalankan: GUNICORN_MODE=asgi gunicorn -c gunicorn_config.py asgi:app
+"""
+from datetime import datetime, timedelta
+import pymongo
+from quart import Blueprint, Quart, current_app, jsonify, request
+from quart_cors import cors
+from async_database import async_read_collection, close_async_client, get_async_client, get_async_db
+from conditional import request_not_modified, set_validators, version_validators
+from json_provider import MongoJSONProvider
+from models.collection_version import CollectionVersion
+from models.machine import LIST_PROJECTION as MACHINE_LIST_PROJECTION, Machine
+from models.maintenance_rollup import MaintenanceRollup
+from models.work_order import LIST_PROJECTION as WORK_ORDER_LIST_PROJECTION, WorkOrder
+from pagination import page_query, parse_fields, split_page
+from routes.report_routes import build_machine_health_pipeline
+from streaming import STREAM_BATCH_SIZE
+import os
+
+async_bp = Blueprint('async_api', __name__)
+
+
+async def paginate_async(collection, query=None, sort_key='_id', direction=1, limit=None,
+                         after=None, projection=None):
+    """Padanan pagination.paginate untuk AsyncCollection"""
+    query, sort, fetch = page_query(query, sort_key, direction, limit, after)
+    cursor = async_read_collection(collection).find(query, projection).sort(sort).limit(fetch)
+    return split_page(await cursor.to_list(), limit, sort_key)
+
+
+async def collection_validators_async(db, collection_name):
+    """Padanan conditional.collection_validators untuk AsyncDatabase"""
+    doc = await db[CollectionVersion.COLLECTION].find_one({'_id': collection_name})
+    return version_validators(collection_name, *CollectionVersion.parse(doc))
+
+
+async def conditional_response_async(etag, last_modified, build):
+    """Padanan conditional.conditional_response dengan build() async"""
+    if request_not_modified(request, etag, last_modified):
+        response = current_app.response_class(None, status=304)
+    else:
+        response = await build()
+    return set_validators(response, etag, last_modified)
+
+
+@async_bp.route('/api/machines/', methods=['GET'])
+async def get_all_machines():
+    """GET semua mesin per halaman"""
+    try:
+        limit = request.args.get('limit', type=int)
+        after = request.args.get('after')
+        projection = parse_fields(request.args.get('fields')) or MACHINE_LIST_PROJECTION
+
+        db = get_async_db()
+        etag, last_modified = await collection_validators_async(db, Machine.COLLECTION)
+
+        async def build():
+            machines, next_cursor = await paginate_async(
+                db[Machine.COLLECTION], limit=limit, after=after, projection=projection
+            )
+            return jsonify({'success': True, 'data': machines, 'next_cursor': next_cursor})
+
+        return await conditional_response_async(etag, last_modified, build)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@async_bp.route('/api/work-orders/', methods=['GET'])
+async def get_all_work_orders():
+    """GET semua work orders dengan filter optional"""
+    try:
+        filters = {}
+        for field in ('status', 'priority', 'machine_id'):
+            value = request.args.get(field)
+            if value:
+                filters[field] = value
+
+        limit = request.args.get('limit', type=int)
+        after = request.args.get('after')
+        projection = parse_fields(request.args.get('fields'), 'created_at') or WORK_ORDER_LIST_PROJECTION
+
+        db = get_async_db()
+        etag, last_modified = await collection_validators_async(db, WorkOrder.COLLECTION)
+
+        async def build():
+            work_orders, next_cursor = await paginate_async(
+                db[WorkOrder.COLLECTION], filters, 'created_at', -1, limit, after, projection
+            )
+            return jsonify({'success': True, 'data': work_orders, 'next_cursor': next_cursor})
+
+        return await conditional_response_async(etag, last_modified, build)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@async_bp.route('/api/reports/maintenance-summary', methods=['GET'])
+async def get_maintenance_summary():
+    """GET ringkasan maintenance dalam periode tertentu"""
+    try:
+        days = request.args.get('days', default=30, type=int)
+        start = request.args.get('start') or datetime.utcnow() - timedelta(days=days)
+        end = request.args.get('end')
+        group_by = request.args.get('group_by', default='type').split(',')
+        machine_id = request.args.get('machine_id')
+
+        db = get_async_db()
+        # Building the pipeline does no I/O, so the model is shared as is
+        pipeline = MaintenanceRollup(db).build_summary_pipeline(start, end, group_by, machine_id)
+        cursor = await db[MaintenanceRollup.COLLECTION].aggregate(pipeline, batchSize=STREAM_BATCH_SIZE)
+        summary = await cursor.to_list()
+
+        return jsonify({'success': True, 'data': summary}), 200
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@async_bp.route('/api/reports/machine-health', methods=['GET'])
+async def get_machine_health():
+    """GET status kesehatan semua mesin"""
+    try:
+        filters = {}
+        for field in ('location', 'status'):
+            value = request.args.get(field)
+            if value:
+                filters[field] = value
+        page = request.args.get('page', default=1, type=int)
+        per_page = request.args.get('per_page', default=0, type=int)
+        skip = (page - 1) * per_page if per_page > 0 and page > 1 else 0
+
+        db = get_async_db()
+        pipeline = build_machine_health_pipeline(filters, skip, max(per_page, 0))
+        cursor = await db[Machine.COLLECTION].aggregate(pipeline, batchSize=STREAM_BATCH_SIZE)
+        health_report = await cursor.to_list()
+
+        return jsonify({'success': True, 'data': health_report}), 200
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+def create_async_app():
+    app = Quart(__name__)
+    app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key-hyundai-cmms')
+    app.json = MongoJSONProvider(app)
+    app = cors(app, allow_origin=['http://localhost:3000', 'http://nextjs:3000'])
+
+    app.register_blueprint(async_bp)
+
+    @app.after_serving
+    async def shutdown():
+        await close_async_client()
+
+    @app.route('/health', methods=['GET'])
+    async def health_check():
+        try:
+            with pymongo.timeout(float(os.getenv('HEALTH_CHECK_TIMEOUT', '2'))):
+                await get_async_client().admin.command('ping')
+        except Exception as e:
+            return jsonify({
+                'status': 'unhealthy',
+                'service': 'Hyundai CMMS API (async)',
+                'database': 'unreachable',
+                'error': str(e)
+            }), 503
+        return jsonify({'status': 'healthy', 'service': 'Hyundai CMMS API (async)', 'database': 'ok'}), 200
+
+    return app
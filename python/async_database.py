@@ -0,0 +1,43 @@
+from pymongo import AsyncMongoClient
+from database import RAW_BSON_READS, RAW_CODEC_OPTIONS, get_client_options, pool_stats
+import os
+
+# One client per event loop; the ASGI server runs a single loop per worker
+_client = None
+
+
+def get_async_client():
+    """Get the AsyncMongoClient shared by this worker's event loop"""
+    global _client
+
+    if _client is None:
+        mongo_uri = os.getenv('MONGODB_URI', 'mongodb://mongodb:27017/')
+        _client = AsyncMongoClient(
+            mongo_uri,
+            connect=False,
+            event_listeners=[pool_stats],
+            **get_client_options()
+        )
+        pool_stats.reset()
+    return _client
+
+
+def get_async_db():
+    """Get async database handle"""
+    return get_async_client()[os.getenv('MONGODB_DB', 'hyundai_cmms')]
+
+
+async def close_async_client():
+    """Tutup client saat worker ASGI berhenti"""
+    global _client
+
+    if _client is not None:
+        await _client.close()
+        _client = None
+
+
+def async_read_collection(collection):
+    """Padanan read_collection untuk AsyncCollection"""
+    if RAW_BSON_READS:
+        return collection.with_options(codec_options=RAW_CODEC_OPTIONS)
+    return collection
@@ -0,0 +1,126 @@
+import codecs
+import csv
+import json
+import time
+from flask import request
+from pymongo.errors import BulkWriteError
+
+DEFAULT_BATCH_SIZE = 1000
+MAX_BATCH_SIZE = 10000
+MAX_REPORTED_ERRORS = 1000
+
+
+def _coerce(row, numeric_fields):
+    for field in numeric_fields:
+        value = row.get(field)
+        if isinstance(value, str):
+            value = value.strip()
+            if value == '':
+                row.pop(field)
+            else:
+                row[field] = float(value) if '.' in value else int(value)
+    return row
+
+
+def _csv_rows(stream, numeric_fields):
+    reader = csv.DictReader(codecs.iterdecode(stream, 'utf-8-sig'))
+    for row in reader:
+        try:
+            yield _coerce({k: v for k, v in row.items() if k}, numeric_fields)
+        except ValueError as e:
+            # Yield the error so one bad line does not end the import
+            yield e
+
+
+def _ndjson_rows(stream):
+    for line in stream:
+        line = line.strip()
+        if line:
+            try:
+                yield json.loads(line)
+            except ValueError as e:
+                yield e
+
+
+def read_rows(numeric_fields=()):
+    """Baca baris import dari JSON array, NDJSON atau CSV (body atau upload file)"""
+    upload = request.files.get('file')
+    if upload is not None:
+        stream, name = upload.stream, (upload.filename or '').lower()
+        content_type = 'text/csv' if name.endswith('.csv') else 'application/x-ndjson'
+    else:
+        stream, content_type = request.stream, request.mimetype
+
+    if content_type == 'text/csv':
+        return _csv_rows(stream, numeric_fields)
+    if content_type == 'application/x-ndjson':
+        return _ndjson_rows(stream)
+
+    rows = request.get_json()
+    if not isinstance(rows, list):
+        raise ValueError('Expected a JSON array, NDJSON or CSV body')
+    return iter(rows)
+
+
+def parse_batch_size(batch_size):
+    """Clamp ukuran batch ke rentang yang diizinkan"""
+    if not batch_size or batch_size <= 0:
+        return DEFAULT_BATCH_SIZE
+    return min(batch_size, MAX_BATCH_SIZE)
+
+
+def import_rows(collection, rows, build, batch_size=None, on_inserted=None):
+    """Insert baris secara batch dengan insert_many unordered
+
+    build mengubah satu baris menjadi dokumen dan boleh raise untuk baris
+    yang tidak valid. on_inserted dipanggil dengan dokumen yang berhasil
+    disimpan per batch. Error per baris dilaporkan tanpa menggagalkan batch.
+    """
+    batch_size = parse_batch_size(batch_size)
+    started = time.perf_counter()
+    report = {'received': 0, 'inserted': 0, 'failed': 0, 'errors': []}
+
+    def fail(row_number, error):
+        report['failed'] += 1
+        if len(report['errors']) < MAX_REPORTED_ERRORS:
+            report['errors'].append({'row': row_number, 'error': error})
+
+    def flush(batch):
+        if not batch:
+            return
+        documents = [doc for _, doc in batch]
+        failed_indexes = set()
+        try:
+            collection.insert_many(documents, ordered=False)
+        except BulkWriteError as e:
+            for error in e.details.get('writeErrors', []):
+                failed_indexes.add(error['index'])
+                fail(batch[error['index']][0], error.get('errmsg', 'write error'))
+        inserted = [doc for i, doc in enumerate(documents) if i not in failed_indexes]
+        report['inserted'] += len(inserted)
+        if on_inserted and inserted:
+            on_inserted(inserted)
+
+    batch = []
+    for row_number, row in enumerate(rows, 1):
+        report['received'] += 1
+        try:
+            if isinstance(row, Exception):
+                raise row
+            if not isinstance(row, dict):
+                raise ValueError('row must be an object')
+            batch.append((row_number, build(row)))
+        except KeyError as e:
+            fail(row_number, f'missing field {e}')
+        except (TypeError, ValueError) as e:
+            fail(row_number, str(e))
+
+        if len(batch) >= batch_size:
+            flush(batch)
+            batch = []
+    flush(batch)
+
+    elapsed = time.perf_counter() - started
+    report['elapsed_ms'] = round(elapsed * 1000, 1)
+    report['rows_per_second'] = round(report['received'] / elapsed, 1) if elapsed else None
+    return report
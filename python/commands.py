@@ -0,0 +1,105 @@
+import click
+from database import get_db, init_db
+from indexes import check_query_plans, diff_indexes, sync_indexes
+from migrations import SCHEMA_VERSION, bootstrap, get_schema_state, migrate_inventory_transactions
+from models.inventory import Inventory
+from models.maintenance_rollup import MaintenanceRollup
+from sweeper import run_sweeper, sweep_overdue
+
+
+def register_commands(app):
+    """Daftarkan perintah maintenance ke Flask CLI"""
+
+    @app.cli.command('init-db')
+    def init_db_command():
+        """Create database indexes and apply pending migrations."""
+        if not init_db():
+            raise SystemExit(1)
+
+    @app.cli.command('bootstrap')
+    @click.option('--force', is_flag=True, help='Re-sync indexes and re-run every migration.')
+    def bootstrap_command(force):
+        """Build missing indexes and apply pending migrations, once per schema version."""
+        if bootstrap(get_db(), force=force, log=click.echo) is None:
+            raise SystemExit(1)
+
+    @app.cli.command('schema-version')
+    def schema_version_command():
+        """Show the recorded schema version."""
+        state = get_schema_state(get_db())
+        click.echo(f"Database at version {state.get('version', 0)}, code at version {SCHEMA_VERSION}")
+        if state.get('locked_by'):
+            click.echo(f"Bootstrap running in {state['locked_by']} until {state['locked_until']}")
+
+    @app.cli.command('migrate-inventory-transactions')
+    @click.option('--batch-size', default=1000, show_default=True)
+    def migrate_inventory_transactions_command(batch_size):
+        """Move embedded inventory transactions into inventory_transactions."""
+        migrated_items, migrated_transactions = migrate_inventory_transactions(get_db(), batch_size)
+        click.echo(f'Migrated {migrated_transactions} transactions from {migrated_items} items')
+
+    @app.cli.command('repair-low-stock')
+    def repair_low_stock():
+        """Backfill or repair the materialized low-stock flags."""
+        modified = Inventory(get_db()).repair_low_stock_flags()
+        click.echo(f'Updated low-stock flags on {modified} items')
+
+    @app.cli.command('release-stale-reservations')
+    @click.option('--older-than', default=300, show_default=True, help='Seconds before a pending reservation counts as interrupted.')
+    def release_stale_reservations(older_than):
+        """Finish or roll back part reservations interrupted by a crash."""
+        kept, released = Inventory(get_db()).release_stale_reservations(older_than)
+        click.echo(f'Kept {kept} and released {released} interrupted reservations')
+
+    @app.cli.command('rebuild-maintenance-rollups')
+    @click.option('--since', default=None, help='Only rebuild days from this ISO date on.')
+    def rebuild_maintenance_rollups(since):
+        """Rebuild daily maintenance rollups from maintenance_history."""
+        total = MaintenanceRollup(get_db()).rebuild(since)
+        click.echo(f'Maintenance rollups rebuilt, {total} rollup documents')
+
+    @app.cli.command('sweep-overdue')
+    @click.option('--interval', default=0, show_default=True, help='Repeat every N seconds; 0 runs once.')
+    @click.option('--batch-size', default=1000, show_default=True)
+    def sweep_overdue_command(interval, batch_size):
+        """Transition past-due schedules and compliance records to overdue."""
+        if interval > 0:
+            run_sweeper(get_db(), interval, batch_size, log=click.echo)
+            return
+        for collection_name, result in sweep_overdue(get_db(), batch_size=batch_size).items():
+            click.echo(
+                f"{collection_name}: {result['flipped']} marked overdue in {result['elapsed_ms']} ms "
+                f"({result['collection_size']} documents)"
+            )
+
+    @app.cli.command('sync-indexes')
+    @click.option('--dry-run', is_flag=True, help='Only show the differences.')
+    @click.option('--drop-extra', is_flag=True, help='Drop indexes that are not declared.')
+    def sync_indexes_command(dry_run, drop_extra):
+        """Diff declared indexes against the database and build missing ones."""
+        db = get_db()
+        report = diff_indexes(db) if dry_run else sync_indexes(db, drop_extra)
+        for collection_name, changes in report.items():
+            for index in changes['missing']:
+                action = 'missing' if dry_run else 'created'
+                click.echo(f"{collection_name}: {action} {dict(index.document['key'])}")
+            for name, index, _ in changes['changed']:
+                action = 'differs' if dry_run else 'updated'
+                click.echo(f"{collection_name}: {action} {name} {dict(index.document['key'])}")
+            for name in changes['extra']:
+                action = 'dropped' if drop_extra and not dry_run else 'extra'
+                click.echo(f'{collection_name}: {action} {name}')
+
+    @app.cli.command('check-query-plans')
+    def check_query_plans_command():
+        """Explain every route query shape, fail on COLLSCAN or in-memory SORT."""
+        problems = check_query_plans(get_db())
+        for problem in problems:
+            click.echo(
+                f"{problem['collection']}: {problem['query']} sort={problem['sort']} "
+                f"-> {' > '.join(problem['stages'])}",
+                err=True
+            )
+        if problems:
+            raise SystemExit(1)
+        click.echo('All query shapes use an index')
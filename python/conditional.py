@@ -0,0 +1,78 @@
+from datetime import datetime, timezone
+from hashlib import sha1
+from flask import current_app, request
+from models.collection_version import CollectionVersion
+
+
+def make_etag(*parts):
+    """ETag kuat dari bagian-bagian versi (tanpa tanda kutip)"""
+    return sha1('|'.join(str(part) for part in parts).encode()).hexdigest()
+
+
+def _http_date(value):
+    if not isinstance(value, datetime):
+        return None
+    # Stored timestamps are naive UTC; HTTP dates have second precision
+    return value.replace(tzinfo=timezone.utc, microsecond=0)
+
+
+def request_not_modified(req, etag, last_modified=None):
+    """True jika If-None-Match atau If-Modified-Since pada req masih valid
+
+    req bisa request Flask maupun Quart (keduanya request Werkzeug), jadi
+    app async memakai logika yang sama.
+    """
+    if req.if_none_match:
+        # If-None-Match takes precedence over If-Modified-Since (RFC 9110)
+        # Weak comparison (RFC 9110 13.1.2): a W/ tag from a proxy still matches
+        return req.if_none_match.contains_weak(etag)
+    last_modified = _http_date(last_modified)
+    if last_modified is not None and req.if_modified_since:
+        return last_modified <= req.if_modified_since
+    return False
+
+
+def is_not_modified(etag, last_modified=None):
+    """True jika If-None-Match atau If-Modified-Since request masih valid"""
+    return request_not_modified(request, etag, last_modified)
+
+
+def set_validators(response, etag, last_modified):
+    """Pasang ETag, Last-Modified dan Cache-Control pada response Flask atau Quart"""
+    response.set_etag(etag)
+    last_modified = _http_date(last_modified)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    # Clients may store the body but must revalidate before reusing it
+    response.cache_control.no_cache = True
+    return response
+
+
+def conditional_response(etag, last_modified, build):
+    """304 jika validator cocok, selain itu build() dengan header ETag/Last-Modified
+
+    build dipanggil hanya jika body memang perlu dikirim dan harus
+    mengembalikan Response (misalnya jsonify(...)).
+    """
+    if is_not_modified(etag, last_modified):
+        response = current_app.response_class(status=304)
+    else:
+        response = build()
+    return set_validators(response, etag, last_modified)
+
+
+def version_validators(collection_name, version, updated_at):
+    """Validator (etag, last_modified) dari versi koleksi"""
+    return make_etag(collection_name, version, updated_at), updated_at
+
+
+def collection_validators(collection):
+    """Validator (etag, last_modified) untuk hasil list dari koleksi
+
+    Memakai versi koleksi yang dinaikkan setiap insert, update dan delete
+    lewat model, jadi satu read by _id tanpa memindai koleksi. Versi
+    berlaku untuk seluruh koleksi: list dengan filter juga divalidasi ulang
+    saat dokumen di luar filter berubah, tetapi tidak pernah basi.
+    """
+    version, updated_at = CollectionVersion(collection.database).get(collection.name)
+    return version_validators(collection.name, version, updated_at)
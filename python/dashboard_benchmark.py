@@ -0,0 +1,156 @@
+"""Benchmark statistik dashboard: enam count lama vs dokumen ringkasan
+
+Mengisi database terpisah (default hyundai_cmms_bench) dengan data sintetis
+lalu mengukur p50/p99 beberapa cara menghitung statistik dashboard:
+
+- legacy: enam count_documents berurutan, query disalin dari route awal
+  (termasuk scan $expr quantity <= min_stock untuk low stock)
+- parallel: count_all (enam count lewat fanout, dipakai saat recompute)
+- summary: get_stats membaca dokumen ringkasan (cache proses dikosongkan)
+- cached: get_stats dari cache per proses
+
+Contoh:
+    python dashboard_benchmark.py --scale 1000,10000,100000 --runs 200
+"""
+import argparse
+from datetime import datetime, timedelta
+import os
+import random
+import time
+from pymongo import MongoClient
+from indexes import sync_indexes
+from models.dashboard_stats import DashboardStats, invalidate_cache
+
+
+def legacy_stats(db):
+    """Implementasi lama: enam count_documents berurutan, query sama persis dengan route awal"""
+    # Total machines
+    total_machines = db['machines'].count_documents({})
+    
+    # Active work orders
+    active_work_orders = db['work_orders'].count_documents({
+        'status': {'$in': ['pending', 'in_progress']}
+    })
+    
+    # Upcoming maintenance (next 7 days)
+    next_week = datetime.utcnow() + timedelta(days=7)
+    upcoming_maintenance = db['maintenance_schedules'].count_documents({
+        'next_scheduled': {'$lte': next_week},
+        'status': 'scheduled'
+    })
+    
+    # Low stock items
+    low_stock = db['inventory'].count_documents({
+        '$expr': {'$lte': ['$quantity', '$min_stock']}
+    })
+    
+    # Critical components
+    critical_components = db['components'].count_documents({
+        'condition': 'critical'
+    })
+    
+    # Overdue compliance
+    overdue_compliance = db['compliance'].count_documents({
+        'due_date': {'$lt': datetime.utcnow()},
+        'status': {'$in': ['pending', 'overdue']}
+    })
+    
+    return {
+        'total_machines': total_machines,
+        'active_work_orders': active_work_orders,
+        'upcoming_maintenance': upcoming_maintenance,
+        'low_stock_items': low_stock,
+        'critical_components': critical_components,
+        'overdue_compliance': overdue_compliance
+    }
+
+
+def inventory_item(rng, i):
+    """Item dengan quantity/min_stock; flag low stock diturunkan seperti create_item"""
+    quantity = rng.randint(0, 200)
+    min_stock = rng.randint(0, 40)
+    return {
+        'part_number': f'P-{i}',
+        'quantity': quantity,
+        'min_stock': min_stock,
+        'is_low_stock': quantity <= min_stock,
+        'stock_deficit': max(0, min_stock - quantity)
+    }
+
+
+def seed(db, scale):
+    """Isi setiap koleksi yang dihitung dashboard dengan scale dokumen"""
+    rng = random.Random(scale)
+    now = datetime.utcnow()
+    documents = {
+        'machines': lambda i: {'name': f'Machine {i}', 'serial_number': f'SN-{i}', 'status': 'operational'},
+        'work_orders': lambda i: {
+            'order_number': f'WO-{i}',
+            'title': f'WO {i}',
+            'status': rng.choice(['pending', 'in_progress', 'completed', 'cancelled']),
+            'created_at': now - timedelta(minutes=i)
+        },
+        'maintenance_schedules': lambda i: {
+            'status': rng.choice(['scheduled', 'completed']),
+            'next_scheduled': now + timedelta(days=rng.randint(-30, 60))
+        },
+        'inventory': lambda i: inventory_item(rng, i),
+        'components': lambda i: {
+            'machine_id': str(i % 100),
+            'part_number': f'C-{i}',
+            'condition': rng.choice(['good', 'fair', 'poor', 'critical'])
+        },
+        'compliance': lambda i: {
+            'status': rng.choice(['pending', 'overdue', 'compliant']),
+            'due_date': now + timedelta(days=rng.randint(-30, 60))
+        }
+    }
+    for collection, build in documents.items():
+        db[collection].drop()
+        for start in range(0, scale, 10000):
+            db[collection].insert_many(
+                [build(i) for i in range(start, min(start + 10000, scale))], ordered=False
+            )
+    sync_indexes(db)
+
+
+def measure(runs, fn, before=None):
+    timings = []
+    for _ in range(runs):
+        if before:
+            before()
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return timings[len(timings) // 2], timings[min(int(len(timings) * 0.99), len(timings) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', default='1000,10000,100000', help='Comma separated documents per collection')
+    parser.add_argument('--database', default='hyundai_cmms_bench')
+    parser.add_argument('--runs', type=int, default=200)
+    args = parser.parse_args()
+
+    if args.database == os.getenv('MONGODB_DB', 'hyundai_cmms'):
+        parser.error('refusing to seed the application database')
+
+    client = MongoClient(os.getenv('MONGODB_URI', 'mongodb://mongodb:27017/'))
+    db = client[args.database]
+    stats = DashboardStats(db)
+    for scale in (int(size) for size in args.scale.split(',')):
+        seed(db, scale)
+        stats.recompute()
+        for name, fn, before in (
+            ('legacy', lambda: legacy_stats(db), None),
+            ('parallel', stats.count_all, None),
+            ('summary', stats.get_stats, invalidate_cache),
+            ('cached', stats.get_stats, None)
+        ):
+            p50, p99 = measure(args.runs, fn, before)
+            print(f'scale={scale:7d} {name:8s} p50={p50:.2f}ms p99={p99:.2f}ms')
+
+
+if __name__ == '__main__':
+    main()
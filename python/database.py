@@ -1,44 +1,230 @@
-from pymongo import MongoClient
+from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
+import pymongo
+from pymongo import MongoClient, monitoring
 from flask import g
+from profiling import query_profiler
 import os
+import threading
+import time
+
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+
+# Opt-in lazy decoding for read-heavy list and export endpoints
+RAW_BSON_READS = os.getenv('MONGODB_RAW_BSON_READS', '').lower() in ('1', 'true', 'yes')
+RAW_CODEC_OPTIONS = CodecOptions(document_class=RawBSONDocument)
+
+
+class PoolStatsListener(monitoring.ConnectionPoolListener):
+    """Collect connection pool statistics for diagnostics"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.pools = 0
+            self.connections_open = 0
+            self.connections_created = 0
+            self.connections_closed = 0
+            self.checked_out = 0
+            self.waiters = 0
+            self.checkouts = 0
+            self.checkout_failures = 0
+            self.wait_time_total = 0.0
+            self.wait_time_max = 0.0
+            self.pool_clears = 0
+
+    def pool_created(self, event):
+        with self._lock:
+            self.pools += 1
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.pool_clears += 1
+
+    def pool_closed(self, event):
+        with self._lock:
+            self.pools = max(self.pools - 1, 0)
+
+    def connection_created(self, event):
+        with self._lock:
+            self.connections_created += 1
+            self.connections_open += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.connections_closed += 1
+            self.connections_open = max(self.connections_open - 1, 0)
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+        with self._lock:
+            self.waiters += 1
+
+    def _finish_wait(self):
+        started = getattr(self._local, 'started', None)
+        self._local.started = None
+        waited = time.perf_counter() - started if started is not None else 0.0
+        self.waiters = max(self.waiters - 1, 0)
+        return waited
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self._finish_wait()
+            self.checkout_failures += 1
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            waited = self._finish_wait()
+            self.checked_out += 1
+            self.checkouts += 1
+            self.wait_time_total += waited
+            self.wait_time_max = max(self.wait_time_max, waited)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out = max(self.checked_out - 1, 0)
+
+    def snapshot(self):
+        with self._lock:
+            avg_wait = self.wait_time_total / self.checkouts if self.checkouts else 0.0
+            return {
+                'pools': self.pools,
+                'connections_open': self.connections_open,
+                'connections_created': self.connections_created,
+                'connections_closed': self.connections_closed,
+                'checked_out': self.checked_out,
+                'waiters': self.waiters,
+                'checkouts': self.checkouts,
+                'checkout_failures': self.checkout_failures,
+                'pool_clears': self.pool_clears,
+                'wait_time_avg_ms': round(avg_wait * 1000, 3),
+                'wait_time_max_ms': round(self.wait_time_max * 1000, 3)
+            }
+
+
+pool_stats = PoolStatsListener()
+
+
+def _env_int(name):
+    value = os.getenv(name)
+    return int(value) if value not in (None, '') else None
+
+
+def get_client_options():
+    """Build MongoClient options from environment variables"""
+    options = {
+        'maxPoolSize': _env_int('MONGODB_MAX_POOL_SIZE') or 100,
+        'minPoolSize': _env_int('MONGODB_MIN_POOL_SIZE') or 0,
+        'maxIdleTimeMS': _env_int('MONGODB_MAX_IDLE_TIME_MS'),
+        'waitQueueTimeoutMS': _env_int('MONGODB_WAIT_QUEUE_TIMEOUT_MS'),
+        'connectTimeoutMS': _env_int('MONGODB_CONNECT_TIMEOUT_MS') or 5000,
+        'serverSelectionTimeoutMS': _env_int('MONGODB_SERVER_SELECTION_TIMEOUT_MS') or 5000,
+        'socketTimeoutMS': _env_int('MONGODB_SOCKET_TIMEOUT_MS'),
+        'readPreference': os.getenv('MONGODB_READ_PREFERENCE'),
+        'readConcernLevel': os.getenv('MONGODB_READ_CONCERN')
+    }
+
+    write_concern = os.getenv('MONGODB_WRITE_CONCERN')
+    if write_concern:
+        options['w'] = int(write_concern) if write_concern.isdigit() else write_concern
+    journal = os.getenv('MONGODB_JOURNAL')
+    if journal:
+        options['journal'] = journal.lower() in ('1', 'true', 'yes')
+
+    return {key: value for key, value in options.items() if value is not None}
+
+
+def get_client():
+    """Get the pooled MongoClient shared by this worker process"""
+    global _client, _client_pid
+
+    pid = os.getpid()
+    if _client is not None and _client_pid == pid:
+        return _client
+
+    with _client_lock:
+        if _client is None or _client_pid != pid:
+            # A client inherited across fork must not be reused or closed
+            # in the child, its sockets belong to the parent process.
+            mongo_uri = os.getenv('MONGODB_URI', 'mongodb://mongodb:27017/')
+            _client = MongoClient(
+                mongo_uri,
+                connect=False,
+                event_listeners=[pool_stats, query_profiler],
+                **get_client_options()
+            )
+            _client_pid = pid
+            pool_stats.reset()
+    return _client
+
+
+def reset_client():
+    """Drop the process client, e.g. from a gunicorn post_fork hook"""
+    global _client, _client_pid
+
+    with _client_lock:
+        if _client is not None and _client_pid == os.getpid():
+            _client.close()
+        _client = None
+        _client_pid = None
+
+
+def get_pool_stats():
+    """Get connection pool statistics of this worker process"""
+    stats = pool_stats.snapshot()
+    stats['pid'] = os.getpid()
+    stats['client_initialized'] = _client is not None and _client_pid == os.getpid()
+    stats['options'] = get_client_options()
+    return stats
+
+
+def read_collection(collection):
+    """Collection untuk read path list/export, RawBSONDocument jika diaktifkan"""
+    if RAW_BSON_READS:
+        return collection.with_options(codec_options=RAW_CODEC_OPTIONS)
+    return collection
+
+
+def ping(timeout=2):
+    """Ping MongoDB dengan batas waktu singkat, True jika berhasil"""
+    with pymongo.timeout(timeout):
+        get_client().admin.command('ping')
+    return True
+
 
 def get_db():
     """Get database connection"""
     if 'db' not in g:
-        # Get MongoDB connection string from environment variable
-        mongo_uri = os.getenv('MONGODB_URI', 'mongodb://mongodb:27017/')
         db_name = os.getenv('MONGODB_DB', 'hyundai_cmms')
-        
-        client = MongoClient(mongo_uri)
-        g.db = client[db_name]
+        g.db = get_client()[db_name]
     
     return g.db
 
 def close_db(e=None):
-    """Close database connection"""
-    db = g.pop('db', None)
-    if db is not None:
-        db.client.close()
+    """Release database handle, the pooled client stays open"""
+    g.pop('db', None)
 
 def init_db():
-    """Initialize database with indexes"""
+    """Initialize database with indexes and pending migrations"""
     db = get_db()
     
-    # Create indexes for better performance
-    db['machines'].create_index('serial_number', unique=True)
-    db['components'].create_index('machine_id')
-    db['components'].create_index('part_number')
-    db['work_orders'].create_index('order_number', unique=True)
-    db['work_orders'].create_index('machine_id')
-    db['work_orders'].create_index('status')
-    db['maintenance_schedules'].create_index('machine_id')
-    db['maintenance_schedules'].create_index('next_scheduled')
-    db['maintenance_history'].create_index('machine_id')
-    db['maintenance_history'].create_index('component_id')
-    db['maintenance_history'].create_index('performed_at')
-    db['audits'].create_index('audit_number', unique=True)
-    db['compliance'].create_index('due_date')
-    db['compliance'].create_index('status')
-    db['inventory'].create_index('part_number', unique=True)
+    # Skips index builds and migrations already recorded in schema_version
+    from migrations import bootstrap
+    if bootstrap(db) is None:
+        # Another process holds the bootstrap lease, nothing was applied here
+        return False
     
-    print("Database indexes created successfully!")
\ No newline at end of file
+    print("Database indexes created successfully!")
+    return True
\ No newline at end of file
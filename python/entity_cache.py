@@ -0,0 +1,170 @@
+from collections import OrderedDict
+import os
+import threading
+import time
+import bson
+from bson import ObjectId
+from metrics import Counter, Gauge, cache_lookups
+
+ENABLED = os.getenv('ENTITY_CACHE_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+MAX_ENTRIES = int(os.getenv('ENTITY_CACHE_MAX_ENTRIES', '5000'))
+MAX_BYTES = int(os.getenv('ENTITY_CACHE_MAX_BYTES', str(32 * 1024 * 1024)))
+# Each worker process has its own cache and only sees its own invalidations.
+# With ENTITY_CACHE_VERIFY (the default) every hit is checked against the
+# current updated_at, so a write from another worker is never served stale.
+# Callers that already probed the version (the conditional GET routes) pass
+# it as expected_version and the check is local; otherwise the hit probes
+# _id + updated_at and saves fetching and decoding the body, not the round
+# trip. Turning it off skips the check but lets other workers serve the old
+# document for up to ENTITY_CACHE_TTL_SECONDS after a write.
+TTL_SECONDS = float(os.getenv('ENTITY_CACHE_TTL_SECONDS', '10'))
+VERIFY = os.getenv('ENTITY_CACHE_VERIFY', 'true').lower() in ('1', 'true', 'yes')
+# Default for expected_version; None is a real version (no updated_at)
+NOT_PROBED = object()
+
+cache_evictions = Counter(
+    'cmms_cache_evictions_total', 'Entries dropped from the entity cache', ('cache', 'reason')
+)
+
+
+class EntityCache:
+    """Cache LRU + TTL per proses untuk dokumen berdasarkan ID
+
+    Dokumen yang dikembalikan dibagi antar request, jangan diubah.
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES, ttl=TTL_SECONDS):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.size_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped on every invalidation so a load racing a write is not stored
+        self._generation = 0
+
+    def _drop(self, key, reason):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size_bytes -= entry[3]
+            if reason:
+                cache_evictions.inc((key[0], reason))
+
+    def get(self, collection, entity_id):
+        """Dokumen dari cache sebagai (doc, version), atau None"""
+        key = (collection, str(entity_id))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[2] <= time.monotonic():
+                self._drop(key, 'ttl')
+                return None
+            self._entries.move_to_end(key)
+            return entry[0], entry[1]
+
+    def set(self, collection, entity_id, doc, generation=None):
+        """Simpan dokumen, lalu buang entri LRU sampai muat di budget"""
+        size = len(bson.encode(doc))
+        if size > self.max_bytes:
+            return
+        key = (collection, str(entity_id))
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._drop(key, None)
+            self._entries[key] = (doc, doc.get('updated_at'), time.monotonic() + self.ttl, size)
+            self.size_bytes += size
+            while len(self._entries) > self.max_entries or self.size_bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._drop(oldest, 'size')
+
+    def invalidate(self, collection, entity_id):
+        """Hapus satu dokumen dari cache setelah ditulis"""
+        with self._lock:
+            self._generation += 1
+            self._drop((collection, str(entity_id)), None)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self.size_bytes = 0
+
+    def get_or_load(self, collection, entity_id, load, verify=None, expected_version=NOT_PROBED):
+        """Read-through: ambil dari cache, atau panggil load() dan simpan hasilnya
+
+        Jika ENTITY_CACHE_VERIFY aktif (default), hit dicek dengan
+        expected_version (updated_at yang sudah di-probe pemanggil) tanpa
+        round trip, atau dengan verify(version) yang harus mengembalikan True
+        jika dokumen di database masih versi itu.
+        """
+        if not ENABLED:
+            return load()
+
+        cached = self.get(collection, entity_id)
+        if cached is not None:
+            doc, version = cached
+            if expected_version is not NOT_PROBED:
+                fresh = not VERIFY or version == expected_version
+            else:
+                fresh = not VERIFY or verify is None or verify(version)
+            if fresh:
+                cache_lookups.inc((collection, 'hit'))
+                return doc
+            self.invalidate(collection, entity_id)
+            cache_evictions.inc((collection, 'stale'))
+
+        cache_lookups.inc((collection, 'miss'))
+        generation = self._generation
+        doc = load()
+        if doc is not None:
+            self.set(collection, entity_id, doc, generation)
+        return doc
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'enabled': ENABLED,
+                'entries': len(self._entries),
+                'size_bytes': self.size_bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'ttl_seconds': self.ttl,
+                'verify': VERIFY
+            }
+
+
+entity_cache = EntityCache()
+
+Gauge('cmms_entity_cache_entries', 'Documents held in the entity cache',
+      callback=lambda: [((), len(entity_cache._entries))])
+Gauge('cmms_entity_cache_bytes', 'Approximate BSON size of the entity cache',
+      callback=lambda: [((), entity_cache.size_bytes)])
+
+
+def version_by_id(collection, entity_id):
+    """Versi dokumen sebagai (ada, updated_at) dari probe _id + updated_at
+
+    Tidak dibaca dari cache: versi dari cache proses lain bisa basi dan
+    menghasilkan 304 yang salah.
+    """
+    doc = collection.find_one({'_id': ObjectId(entity_id)}, {'updated_at': 1})
+    if doc is None:
+        return False, None
+    return True, doc.get('updated_at')
+
+
+def cached_by_id(collection, entity_id, expected_version=NOT_PROBED):
+    """Ambil dokumen by ID lewat entity cache
+
+    expected_version adalah updated_at dari version_by_id; tanpa itu hit
+    di-probe ulang jika VERIFY.
+    """
+    oid = ObjectId(entity_id)
+    return entity_cache.get_or_load(
+        collection.name, entity_id,
+        lambda: collection.find_one({'_id': oid}),
+        lambda version: collection.find_one({'_id': oid, 'updated_at': version}, {'_id': 1}) is not None,
+        expected_version
+    )
@@ -0,0 +1,78 @@
+import logging
+import os
+import threading
+import time
+from pymongo import CursorType
+from models.event_log import EventLog
+
+logger = logging.getLogger(__name__)
+
+_subscribers = []
+
+_tailer = None
+_tailer_pid = None
+_tailer_lock = threading.Lock()
+
+
+def subscribe(callback):
+    """Daftarkan callback(event) untuk semua event"""
+    _subscribers.append(callback)
+    return callback
+
+
+def unsubscribe(callback):
+    """Hapus callback yang didaftarkan dengan subscribe"""
+    try:
+        _subscribers.remove(callback)
+    except ValueError:
+        pass
+
+
+def publish(event):
+    """Kirim event (dokumen event log) ke semua subscriber di proses ini"""
+    for callback in list(_subscribers):
+        try:
+            callback(event)
+        except Exception:
+            # A broken subscriber must not stop delivery to the others
+            logger.exception('Event subscriber failed for %s', event.get('type'))
+
+
+def _tail(collection):
+    """Ikuti capped collection dan publish setiap event baru"""
+    latest = collection.find_one(sort=[('_id', -1)], projection={'_id': 1})
+    last_id = latest['_id'] if latest else 0
+
+    while True:
+        try:
+            cursor = collection.find({'_id': {'$gt': last_id}}, cursor_type=CursorType.TAILABLE_AWAIT)
+            while cursor.alive:
+                for event in cursor:
+                    # IDs are allocated before insert, so they can land slightly out of order
+                    last_id = max(last_id, event['_id'])
+                    publish(event)
+        except Exception:
+            logger.exception('Event log tail failed, retrying')
+        # A tailable cursor on an empty capped collection dies at once
+        time.sleep(1)
+
+
+def start_tailer(db):
+    """Mulai satu thread tail event log per proses worker (idempotent)"""
+    global _tailer, _tailer_pid
+
+    pid = os.getpid()
+    if _tailer is not None and _tailer_pid == pid:
+        return True
+
+    with _tailer_lock:
+        if _tailer is None or _tailer_pid != pid:
+            event_log = EventLog(db)
+            if not event_log.is_capped():
+                logger.error('%s is not a capped collection, run flask bootstrap', EventLog.COLLECTION)
+                return False
+            # Threads do not survive fork, start one per worker
+            _tailer = threading.Thread(target=_tail, args=(event_log.collection,), name='event-tail', daemon=True)
+            _tailer.start()
+            _tailer_pid = pid
+    return True
@@ -0,0 +1,60 @@
+from concurrent.futures import ThreadPoolExecutor, wait
+import contextvars
+import os
+import threading
+import time
+
+MAX_WORKERS = int(os.getenv('FANOUT_MAX_WORKERS', '8'))
+DEFAULT_TIMEOUT = float(os.getenv('FANOUT_TIMEOUT_SECONDS', '5'))
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Thread pool bersama untuk proses worker ini"""
+    global _executor, _executor_pid
+
+    pid = os.getpid()
+    if _executor is None or _executor_pid != pid:
+        with _executor_lock:
+            if _executor is None or _executor_pid != pid:
+                # Threads do not survive fork, start a fresh pool per worker
+                _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='fanout')
+                _executor_pid = pid
+    return _executor
+
+
+def run_parallel(queries, timeout=None):
+    """Jalankan beberapa query independen secara paralel
+
+    queries adalah dict nama -> callable tanpa argumen. Callable berjalan di
+    thread lain tanpa Flask app context, jadi ambil db dengan get_db() sebelum
+    memanggil fungsi ini. Mengembalikan tuple (results, errors); query yang
+    gagal atau melewati deadline tercatat di errors dan tidak ada di results.
+    """
+    timeout = DEFAULT_TIMEOUT if timeout is None else timeout
+    deadline = time.monotonic() + timeout
+    executor = get_executor()
+    # Run each query in a copy of the caller's context so per-request
+    # instrumentation (profiling) still sees it
+    futures = {
+        executor.submit(contextvars.copy_context().run, query): name
+        for name, query in queries.items()
+    }
+
+    done, pending = wait(futures, timeout=max(deadline - time.monotonic(), 0))
+
+    results = {}
+    errors = {}
+    for future in done:
+        name = futures[future]
+        try:
+            results[name] = future.result()
+        except Exception as e:
+            errors[name] = str(e)
+    for future in pending:
+        future.cancel()
+        errors[futures[future]] = 'timed out after %.1fs' % timeout
+    return results, errors
@@ -0,0 +1,118 @@
+"""Konfigurasi gunicorn dengan preset worker sync, gthread dan gevent
+
+Pilih preset dengan GUNICORN_MODE. Jumlah worker dan thread dihitung dari
+jumlah CPU dan bisa ditimpa dengan GUNICORN_WORKERS / GUNICORN_THREADS.
+Reload graceful: kirim SIGHUP ke master (kill -HUP <pid>).
+"""
+import multiprocessing
+import os
+
+CPU_COUNT = multiprocessing.cpu_count()
+
+# sync: one request per process, for CPU-bound work or debugging
+# gthread: threads share the pooled MongoClient, the default for this I/O-bound API
+# gevent: greenlets for many slow or streaming clients (requires gevent)
+# asgi: asyncio event loop per worker for the async variant, serve asgi:app
+PRESETS = {
+    'sync': {
+        'worker_class': 'sync',
+        'workers': CPU_COUNT * 2 + 1,
+        'threads': 1
+    },
+    'gthread': {
+        'worker_class': 'gthread',
+        'workers': CPU_COUNT + 1,
+        'threads': 4
+    },
+    'gevent': {
+        'worker_class': 'gevent',
+        'workers': CPU_COUNT,
+        'threads': 1,
+        'worker_connections': 1000
+    },
+    'asgi': {
+        'worker_class': 'uvicorn_worker.UvicornWorker',
+        'workers': CPU_COUNT,
+        'threads': 1
+    }
+}
+
+
+def _env_bool(name, default=False):
+    value = os.getenv(name)
+    if value in (None, ''):
+        return default
+    return value.lower() in ('1', 'true', 'yes')
+
+
+mode = os.getenv('GUNICORN_MODE', 'gthread')
+if mode not in PRESETS:
+    raise ValueError(f"GUNICORN_MODE must be one of {', '.join(PRESETS)}, got {mode!r}")
+preset = PRESETS[mode]
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5000')
+worker_class = preset['worker_class']
+workers = int(os.getenv('GUNICORN_WORKERS') or preset['workers'])
+threads = int(os.getenv('GUNICORN_THREADS') or preset['threads'])
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS') or preset.get('worker_connections', 1000))
+
+# Load the app once in the master so workers fork with it already imported.
+# No MongoDB connection is opened at import time, and post_worker_init drops
+# any client a preloaded master may have created.
+preload_app = _env_bool('GUNICORN_PRELOAD', True)
+# Code reload for development; incompatible with preload_app
+reload = _env_bool('GUNICORN_RELOAD')
+if reload:
+    preload_app = False
+# The gevent worker monkey-patches after fork. A preloaded app would have
+# imported pymongo and created its threading locks unpatched in the master,
+# which can deadlock greenlets, so gevent always loads the app per worker.
+if worker_class == 'gevent':
+    preload_app = False
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '30'))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', '5'))
+# Recycle workers periodically, jittered so they do not restart together
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '10000'))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', '1000'))
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+
+
+def on_starting(server):
+    # Drop metric snapshots left by workers of a previous run
+    from metrics import clear_multiproc_dir
+    clear_multiproc_dir()
+
+
+def post_fork(server, worker):
+    server.log.info('Worker %s started (%s, %d threads)', worker.pid, worker_class, threads)
+
+
+def post_worker_init(worker):
+    # Runs after the gevent worker has monkey-patched, so the pool locks and
+    # the flusher thread are built on patched primitives.
+    # MongoClient is not fork-safe, each worker builds its own pool
+    from database import reset_client
+    from metrics import start_flusher
+    reset_client()
+    start_flusher()
+    if worker_class in ('sync', 'gthread'):
+        # Each SSE stream pins a thread; keep one free for the REST API
+        from sse import limit_to_threads
+        limit_to_threads(threads)
+
+
+def worker_exit(server, worker):
+    # Fold this worker's final counters into the aggregate and drop its file
+    from metrics import fold_worker
+    fold_worker()
+
+
+def child_exit(server, worker):
+    # Runs in the master; covers workers killed before worker_exit ran
+    from metrics import fold_worker
+    fold_worker(worker.pid)
@@ -0,0 +1,110 @@
+"""Benchmark laporan machine-health: N+1 query lama vs satu aggregate
+
+Mengisi database terpisah (default hyundai_cmms_bench) dengan mesin dan
+komponen sintetis untuk beberapa ukuran fleet, lalu mengukur jumlah round
+trip ke MongoDB dan latency kedua implementasi.
+
+Contoh:
+    python health_benchmark.py --fleet 100,500,2000 --components 20
+"""
+import argparse
+import os
+import random
+import time
+from pymongo import MongoClient, monitoring
+from models.component import Component
+from routes.report_routes import HEALTH_WEIGHTS, build_machine_health_pipeline
+
+
+class CommandCounter(monitoring.CommandListener):
+    """Hitung command yang dikirim ke server"""
+
+    def __init__(self):
+        self.count = 0
+
+    def started(self, event):
+        self.count += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+def legacy_health(db):
+    """Implementasi lama: satu query komponen per mesin"""
+    report = []
+    for machine in db['machines'].find():
+        components = list(db['components'].find({'machine_id': str(machine['_id'])}))
+        breakdown = {condition: 0 for condition in HEALTH_WEIGHTS}
+        for component in components:
+            breakdown[component.get('condition', 'good')] += 1
+        total = len(components)
+        score = sum(breakdown[c] * w for c, w in HEALTH_WEIGHTS.items()) / total if total else 100
+        report.append({'machine_id': str(machine['_id']), 'health_score': round(score, 2)})
+    return report
+
+
+def pipeline_health(db):
+    return list(db['machines'].aggregate(build_machine_health_pipeline()))
+
+
+def seed(db, fleet, components_per_machine):
+    rng = random.Random(fleet)
+    db['machines'].drop()
+    db['components'].drop()
+    db['components'].create_indexes(Component.INDEXES)
+    machines = [{
+        'name': f'Machine {i}',
+        'serial_number': f'SN-{i}',
+        'status': 'operational',
+        'location': f'Line {i % 10}'
+    } for i in range(fleet)]
+    ids = db['machines'].insert_many(machines).inserted_ids
+    components = [{
+        'machine_id': str(machine_id),
+        'name': f'Component {j}',
+        'part_number': f'P-{j}',
+        'condition': rng.choice(list(HEALTH_WEIGHTS))
+    } for machine_id in ids for j in range(components_per_machine)]
+    for start in range(0, len(components), 10000):
+        db['components'].insert_many(components[start:start + 10000], ordered=False)
+
+
+def measure(counter, runs, fn):
+    timings = []
+    commands = 0
+    for _ in range(runs):
+        before = counter.count
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+        commands = counter.count - before
+    timings.sort()
+    return commands, timings[len(timings) // 2], timings[min(int(len(timings) * 0.95), len(timings) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--fleet', default='100,500,2000', help='Comma separated machine counts')
+    parser.add_argument('--components', type=int, default=20, help='Components per machine')
+    parser.add_argument('--database', default='hyundai_cmms_bench')
+    parser.add_argument('--runs', type=int, default=10)
+    args = parser.parse_args()
+
+    if args.database == os.getenv('MONGODB_DB', 'hyundai_cmms'):
+        parser.error('refusing to seed the application database')
+
+    counter = CommandCounter()
+    client = MongoClient(os.getenv('MONGODB_URI', 'mongodb://mongodb:27017/'), event_listeners=[counter])
+    db = client[args.database]
+    for fleet in (int(size) for size in args.fleet.split(',')):
+        seed(db, fleet, args.components)
+        for name, fn in (('legacy N+1', legacy_health), ('aggregate', pipeline_health)):
+            commands, p50, p95 = measure(counter, args.runs, lambda: fn(db))
+            print(f'fleet={fleet:6d} {name:11s} round_trips={commands:6d} p50={p50:.1f}ms p95={p95:.1f}ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,212 @@
+from datetime import datetime, timedelta
+from bson import ObjectId
+from models.audit import Audit
+from models.collection_version import CollectionVersion
+from models.compliance import Compliance
+from models.component import Component
+from models.dashboard_stats import ACTIVE_WORK_ORDER_STATUSES, DashboardStats
+from models.event_log import EventLog
+from models.inventory import Inventory
+from models.inventory_transaction import InventoryTransaction
+from models.machine import Machine
+from models.maintenance_history import MaintenanceHistory
+from models.maintenance_rollup import MaintenanceRollup
+from models.maintenance_schedule import MaintenanceSchedule
+from models.tombstone import Tombstone
+from models.work_order import WorkOrder
+from sync_feed import SYNC_COLLECTIONS, changes_query
+
+MODELS = [
+    Machine,
+    Component,
+    WorkOrder,
+    MaintenanceSchedule,
+    MaintenanceHistory,
+    MaintenanceRollup,
+    Audit,
+    Compliance,
+    Inventory,
+    InventoryTransaction,
+    DashboardStats,
+    Tombstone,
+    EventLog,
+    CollectionVersion
+]
+
+
+def declared_indexes():
+    """Registry index yang dideklarasikan model, per koleksi"""
+    return {model.COLLECTION: list(model.INDEXES) for model in MODELS}
+
+
+# Options that change what an index does; a difference means the index has
+# to be modified (TTL through collMod) or rebuilt
+OPTIONS = ('unique', 'sparse', 'expireAfterSeconds', 'partialFilterExpression')
+
+
+def _is_text(key, weights=None):
+    return bool(weights) or any(direction == 'text' for _, direction in key)
+
+
+def _signature(key, weights=None):
+    key = list(key)
+    # The server stores text indexes as _fts/_ftsx keys with the text fields
+    # in weights, so compare text indexes by their field set
+    if _is_text(key, weights):
+        fields = sorted(weights or [field for field, direction in key if direction == 'text'])
+        return (('$text', tuple(fields)),)
+    return tuple(
+        (field, direction if isinstance(direction, str) else int(direction))
+        for field, direction in key
+    )
+
+
+def _options(spec, key):
+    """Opsi yang dibandingkan, dari index_information() atau IndexModel.document"""
+    key = list(key)
+    options = {name: spec[name] for name in OPTIONS if spec.get(name) not in (None, False)}
+    if 'expireAfterSeconds' in options:
+        options['expireAfterSeconds'] = int(options['expireAfterSeconds'])
+    if _is_text(key, spec.get('weights')):
+        weights = spec.get('weights') or {field: 1 for field, direction in key if direction == 'text'}
+        options['weights'] = {field: int(weight) for field, weight in weights.items()}
+        options['default_language'] = spec.get('default_language', 'english')
+    return options
+
+
+def _ttl_only(current, wanted):
+    """True jika hanya expireAfterSeconds yang berbeda, cukup collMod"""
+    changed = {name for name in set(current) | set(wanted) if current.get(name) != wanted.get(name)}
+    return changed == {'expireAfterSeconds'} and 'expireAfterSeconds' in current and 'expireAfterSeconds' in wanted
+
+
+def diff_indexes(db):
+    """Bandingkan index yang dideklarasikan dengan yang ada di database
+
+    Mengembalikan dict per koleksi berisi missing (IndexModel yang belum ada),
+    changed ((nama, IndexModel, opsi saat ini) untuk index dengan key sama
+    tetapi opsi berbeda, misalnya expireAfterSeconds) dan extra (nama index
+    yang ada tetapi tidak dideklarasikan).
+    """
+    report = {}
+    for collection_name, indexes in declared_indexes().items():
+        existing = {}
+        for name, info in db[collection_name].index_information().items():
+            if name != '_id_':
+                existing[_signature(info['key'], info.get('weights'))] = (name, _options(info, info['key']))
+
+        declared = set()
+        missing = []
+        changed = []
+        for index in indexes:
+            document = index.document
+            signature = _signature(document['key'].items())
+            declared.add(signature)
+            if signature not in existing:
+                missing.append(index)
+                continue
+            name, current = existing[signature]
+            if current != _options(document, document['key'].items()):
+                changed.append((name, index, current))
+
+        extra = [name for signature, (name, _) in existing.items() if signature not in declared]
+        report[collection_name] = {'missing': missing, 'changed': changed, 'extra': extra}
+    return report
+
+
+def sync_indexes(db, drop_extra=False):
+    """Buat index yang belum ada, satu createIndexes per koleksi
+
+    Index dengan opsi berbeda diperbaiki: perubahan TTL saja lewat collMod,
+    selain itu index lama di-drop lalu dibuat ulang bersama yang missing.
+    """
+    report = diff_indexes(db)
+    for collection_name, changes in report.items():
+        rebuild = []
+        for name, index, current in changes['changed']:
+            document = index.document
+            if _ttl_only(current, _options(document, document['key'].items())):
+                db.command('collMod', collection_name, index={
+                    'name': name,
+                    'expireAfterSeconds': int(document['expireAfterSeconds'])
+                })
+            else:
+                db[collection_name].drop_index(name)
+                rebuild.append(index)
+        if changes['missing'] or rebuild:
+            db[collection_name].create_indexes(changes['missing'] + rebuild)
+        if drop_extra:
+            for name in changes['extra']:
+                db[collection_name].drop_index(name)
+    return report
+
+
+def query_shapes():
+    """Bentuk query yang dipakai route, untuk dicek dengan explain()"""
+    now = datetime.utcnow()
+    position = [now - timedelta(hours=1), ObjectId()]
+    sync_feed = [
+        # /api/sync keyset pages on (updated_at, _id), first page and resumed
+        (collection_name, changes_query('updated_at', start, now), [('updated_at', 1), ('_id', 1)])
+        for collection_name in SYNC_COLLECTIONS
+        for start in (None, position)
+    ]
+    return sync_feed + [
+        ('machines', {}, [('_id', 1)]),
+        ('machines', {'location': 'Line A', 'status': 'operational'}, [('_id', 1)]),
+        ('components', {'machine_id': 'x'}, [('_id', 1)]),
+        ('components', {'condition': 'critical'}, None),
+        ('work_orders', {}, [('created_at', -1), ('_id', -1)]),
+        ('work_orders', {'status': 'pending'}, [('created_at', -1), ('_id', -1)]),
+        ('work_orders', {'status': 'pending', 'priority': 'high'}, [('created_at', -1), ('_id', -1)]),
+        ('work_orders', {'status': 'pending', 'priority': 'high', 'machine_id': 'x'}, [('created_at', -1), ('_id', -1)]),
+        ('work_orders', {'machine_id': 'x'}, [('created_at', -1), ('_id', -1)]),
+        ('work_orders', {'status': {'$in': ACTIVE_WORK_ORDER_STATUSES}}, None),
+        ('maintenance_schedules', {
+            'next_scheduled': {'$lte': now + timedelta(days=30)},
+            'status': {'$in': ['scheduled', 'overdue']}
+        }, [('next_scheduled', 1), ('_id', 1)]),
+        ('maintenance_history', {'machine_id': 'x'}, [('performed_at', -1)]),
+        ('maintenance_history', {'component_id': 'x'}, [('performed_at', -1)]),
+        ('maintenance_rollups', {'day': {'$gte': now - timedelta(days=365)}}, None),
+        ('maintenance_schedules', {'status': 'scheduled', 'next_scheduled': {'$lt': now}}, [('next_scheduled', 1)]),
+        ('maintenance_schedules', {'status': 'overdue'}, [('next_scheduled', 1), ('_id', 1)]),
+        ('compliance', {'status': 'pending', 'due_date': {'$lt': now}}, [('due_date', 1)]),
+        ('compliance', {'status': 'overdue'}, [('due_date', 1)]),
+        ('inventory', {'is_low_stock': True}, [('stock_deficit', -1)]),
+        ('work_orders', {'$text': {'$search': 'hydraulic leak'}}, None),
+        ('maintenance_history', {'$text': {'$search': 'hydraulic leak'}}, None),
+        ('components', {'part_number': {'$regex': '^HX-'}}, None),
+        ('tombstones', changes_query(
+            'deleted_at', position, now, {'collection': {'$in': ['machines', 'work_orders']}}
+        ), [('deleted_at', 1), ('_id', 1)]),
+        ('inventory_transactions', {'item_id': 'x'}, [('timestamp', -1), ('_id', -1)])
+    ]
+
+
+def _plan_stages(plan):
+    stages = [plan.get('stage')]
+    for child in [plan.get('inputStage')] + plan.get('inputStages', []):
+        if child:
+            stages += _plan_stages(child)
+    return stages
+
+
+def check_query_plans(db):
+    """Jalankan explain() untuk setiap bentuk query, kembalikan yang bermasalah"""
+    problems = []
+    for collection_name, query, sort in query_shapes():
+        cursor = db[collection_name].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        winning = cursor.explain()['queryPlanner']['winningPlan']
+        stages = _plan_stages(winning.get('queryPlan', winning))
+        bad = [stage for stage in stages if stage in ('COLLSCAN', 'SORT')]
+        if bad:
+            problems.append({
+                'collection': collection_name,
+                'query': query,
+                'sort': sort,
+                'stages': stages
+            })
+    return problems
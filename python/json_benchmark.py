@@ -0,0 +1,107 @@
+"""Micro-benchmark serialisasi JSON untuk payload work order
+
+Membandingkan tiga cara membangun body response list work order:
+
+- orjson: dumps_bytes dengan orjson (jalur default jika terpasang)
+- stdlib: dumps_bytes dengan fallback json standar (orjson dimatikan)
+- legacy: loop str(_id) per dokumen lalu DefaultJSONProvider Flask,
+  seperti route sebelum MongoJSONProvider
+
+Payload sintetis meniru dokumen work order (ObjectId, datetime, notes
+embedded), tidak butuh MongoDB.
+
+Contoh:
+    python json_benchmark.py --sizes 50,500,5000 --repeat 20
+"""
+import argparse
+import copy
+from datetime import datetime, timedelta
+import random
+import timeit
+from bson import ObjectId
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+import json_provider
+from json_provider import dumps_bytes
+
+PRIORITIES = ['low', 'medium', 'high', 'critical']
+STATUSES = ['pending', 'in_progress', 'completed', 'cancelled']
+
+
+def make_work_orders(count, notes_per_order=5):
+    """Work order sintetis dengan bentuk yang sama seperti create_work_order"""
+    rng = random.Random(count)
+    now = datetime.utcnow()
+    work_orders = []
+    for i in range(count):
+        created = now - timedelta(minutes=rng.randint(0, 100000))
+        work_orders.append({
+            '_id': ObjectId(),
+            'order_number': f'WO-{i:06d}',
+            'machine_id': str(ObjectId()),
+            'component_id': str(ObjectId()) if rng.random() < 0.5 else None,
+            'title': f'Replace bearing on spindle {i}',
+            'description': 'Abnormal vibration detected during the weekly inspection round. ' * 2,
+            'priority': rng.choice(PRIORITIES),
+            'status': rng.choice(STATUSES),
+            'type': 'corrective',
+            'assigned_to': f'technician-{rng.randint(1, 40)}',
+            'estimated_hours': rng.randint(1, 16),
+            'actual_hours': round(rng.random() * 16, 2),
+            'scheduled_date': created + timedelta(days=1),
+            'started_at': created + timedelta(hours=2),
+            'completed_at': None,
+            'notes': [{
+                'content': f'Checked clearance, reading {rng.random():.3f} mm',
+                'author': f'technician-{rng.randint(1, 40)}',
+                'created_at': created + timedelta(hours=n)
+            } for n in range(notes_per_order)],
+            'created_at': created,
+            'updated_at': created + timedelta(hours=3)
+        })
+    return work_orders
+
+
+def legacy_body(provider, work_orders):
+    """Route lama: stringify _id per dokumen lalu jsonify bawaan Flask"""
+    for work_order in work_orders:
+        work_order['_id'] = str(work_order['_id'])
+    return provider.dumps({'success': True, 'data': work_orders}).encode()
+
+
+def stdlib_body(work_orders):
+    saved, json_provider.orjson = json_provider.orjson, None
+    try:
+        return dumps_bytes({'success': True, 'data': work_orders})
+    finally:
+        json_provider.orjson = saved
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='50,500,5000', help='Comma separated documents per response')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    legacy_provider = DefaultJSONProvider(Flask(__name__))
+    variants = [('stdlib', stdlib_body)]
+    if json_provider.orjson is not None:
+        variants.insert(0, ('orjson', lambda docs: dumps_bytes({'success': True, 'data': docs})))
+    else:
+        print('orjson not installed, skipping the orjson variant')
+
+    for size in (int(value) for value in args.sizes.split(',')):
+        work_orders = make_work_orders(size)
+        for name, fn in variants:
+            best = min(timeit.repeat(lambda: fn(work_orders), number=1, repeat=args.repeat))
+            print(f'size={size:6d} {name:7s} {best * 1000:8.2f}ms {len(fn(work_orders)):9d} bytes')
+        # The legacy loop mutates _id in place, so every run gets a fresh copy
+        copies = [copy.deepcopy(work_orders) for _ in range(args.repeat)]
+        timings = []
+        for docs in copies:
+            timings.append(timeit.timeit(lambda: legacy_body(legacy_provider, docs), number=1))
+        print(f'size={size:6d} {"legacy":7s} {min(timings) * 1000:8.2f}ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+from datetime import date, datetime, timezone
+import json
+import bson
+from bson import ObjectId
+from bson.decimal128 import Decimal128
+from bson.raw_bson import RawBSONDocument
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+
+def _default(value):
+    """Encode tipe BSON yang tidak didukung JSON secara native"""
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, RawBSONDocument):
+        # Decode the raw bytes in one pass only when the row is serialized
+        return bson.decode(value.raw)
+    if isinstance(value, datetime):
+        # Stored datetimes are naive UTC (datetime.utcnow)
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Decimal128):
+        return str(value.to_decimal())
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def dumps_bytes(obj):
+    """Serialisasi obj ke JSON bytes, memakai orjson jika tersedia"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, default=_default, ensure_ascii=False, separators=(',', ':')).encode()
+
+
+class MongoJSONProvider(DefaultJSONProvider):
+    """JSON provider Flask yang menangani ObjectId/datetime di kedalaman mana pun"""
+
+    def dumps(self, obj, **kwargs):
+        if orjson is not None and not kwargs:
+            return dumps_bytes(obj).decode()
+        kwargs.setdefault('default', _default)
+        return json.dumps(obj, **kwargs)
+
+    def response(self, *args, **kwargs):
+        if args and kwargs:
+            raise TypeError('jsonify() behavior undefined when passed both args and kwargs')
+        if not args and not kwargs:
+            obj = None
+        elif len(args) == 1:
+            obj = args[0]
+        else:
+            obj = args or kwargs
+        return self._app.response_class(dumps_bytes(obj), mimetype=self.mimetype)
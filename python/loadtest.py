@@ -0,0 +1,195 @@
+"""Load test sederhana untuk membandingkan request/detik antar mode gunicorn
+
+Contoh:
+    python loadtest.py --url http://localhost:5000/api/machines
+    python loadtest.py --modes sync,gthread,gevent,asgi --path /api/reports/machine-health
+
+Dengan --modes, script menjalankan gunicorn untuk setiap preset secara
+bergantian (MongoDB harus sudah berjalan) lalu mencetak perbandingannya,
+termasuk total RSS worker setelah beban untuk membandingkan memori.
+Preset asgi menjalankan varian async (asgi:app).
+
+Mode --sse membuka banyak koneksi ke stream event dan menghitung event
+yang diterima setiap subscriber:
+    python loadtest.py --url http://localhost:5000/api/events/stream --sse 300 --duration 60
+"""
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import os
+import subprocess
+import sys
+import threading
+import time
+import requests
+
+
+def run_load(url, concurrency, duration):
+    """Kirim GET ke url dari beberapa thread selama duration detik"""
+    deadline = time.monotonic() + duration
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+
+    def worker():
+        session = requests.Session()
+        local_latencies = []
+        local_errors = 0
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            try:
+                response = session.get(url, timeout=10)
+                if response.status_code >= 400:
+                    local_errors += 1
+            except requests.RequestException:
+                local_errors += 1
+            local_latencies.append(time.perf_counter() - started)
+        with lock:
+            latencies.extend(local_latencies)
+            errors[0] += local_errors
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for _ in range(concurrency):
+            executor.submit(worker)
+    elapsed = time.monotonic() - started
+
+    latencies.sort()
+
+    def percentile(p):
+        if not latencies:
+            return None
+        return round(latencies[min(int(len(latencies) * p), len(latencies) - 1)] * 1000, 1)
+
+    return {
+        'requests': len(latencies),
+        'errors': errors[0],
+        'requests_per_second': round(len(latencies) / elapsed, 1),
+        'p50_ms': percentile(0.5),
+        'p95_ms': percentile(0.95),
+        'p99_ms': percentile(0.99)
+    }
+
+
+def run_sse(url, subscribers, duration):
+    """Buka subscribers koneksi SSE selama duration detik dan hitung event"""
+    deadline = time.monotonic() + duration
+    received = [0] * subscribers
+    failures = []
+    lock = threading.Lock()
+
+    def subscriber(index):
+        try:
+            with requests.get(url, stream=True, timeout=(10, 30)) as response:
+                if response.status_code != 200:
+                    with lock:
+                        failures.append(response.status_code)
+                    return
+                for line in response.iter_lines(decode_unicode=True):
+                    if line and line.startswith('event:') and line != 'event: overflow':
+                        received[index] += 1
+                    elif line == 'event: overflow':
+                        with lock:
+                            failures.append('overflow')
+                        return
+                    if time.monotonic() >= deadline:
+                        return
+        except requests.RequestException as e:
+            with lock:
+                failures.append(type(e).__name__)
+
+    threads = [threading.Thread(target=subscriber, args=(i,), daemon=True) for i in range(subscribers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        # Heartbeats wake idle readers, so this returns shortly after the deadline
+        thread.join(max(deadline - time.monotonic(), 0) + 35)
+
+    connected = subscribers - len(failures)
+    return {
+        'subscribers': subscribers,
+        'connected': connected,
+        'failures': failures[:20],
+        'events_min': min(received) if received else 0,
+        'events_max': max(received) if received else 0,
+        'events_total': sum(received)
+    }
+
+
+def wait_healthy(base_url, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(base_url + '/health', timeout=2).status_code == 200:
+                return True
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    return False
+
+
+def process_tree_rss_mb(pid):
+    """Total RSS proses dan anak-anaknya dalam MB (Linux, via /proc)"""
+    total_kb = 0
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/status') as f:
+                status = dict(line.split(':', 1) for line in f if ':' in line)
+        except OSError:
+            continue
+        if int(entry) == pid or int(status.get('PPid', '0').strip()) == pid:
+            total_kb += int(status.get('VmRSS', '0 kB').split()[0])
+    return round(total_kb / 1024, 1)
+
+
+def run_mode(mode, port, path, concurrency, duration):
+    env = dict(os.environ, GUNICORN_MODE=mode, GUNICORN_BIND=f'127.0.0.1:{port}', GUNICORN_ACCESS_LOG='')
+    target = 'asgi:app' if mode == 'asgi' else 'wsgi:app'
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn_config.py', target],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=env
+    )
+    base_url = f'http://127.0.0.1:{port}'
+    try:
+        if not wait_healthy(base_url):
+            return {'error': 'server did not become healthy'}
+        result = run_load(base_url + path, concurrency, duration)
+        if os.path.isdir('/proc'):
+            result['rss_mb'] = process_tree_rss_mb(process.pid)
+        return result
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', help='Target URL of an already running server')
+    parser.add_argument('--modes', help='Comma separated gunicorn presets to start and compare')
+    parser.add_argument('--path', default='/api/machines', help='Path to request when using --modes')
+    parser.add_argument('--port', type=int, default=5055)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=15)
+    parser.add_argument('--sse', type=int, default=0, help='Open N SSE subscribers on --url instead of GET load')
+    args = parser.parse_args()
+
+    if args.url and args.sse:
+        results = {args.url: run_sse(args.url, args.sse, args.duration)}
+    elif args.url:
+        results = {args.url: run_load(args.url, args.concurrency, args.duration)}
+    elif args.modes:
+        results = {
+            mode: run_mode(mode, args.port, args.path, args.concurrency, args.duration)
+            for mode in args.modes.split(',')
+        }
+    else:
+        parser.error('pass --url or --modes')
+
+    for name, result in results.items():
+        print(f'{name}: {result}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,307 @@
+from bisect import bisect_left
+from contextlib import contextmanager
+import glob
+import json
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - no file locks outside POSIX
+    fcntl = None
+
+# Updates are deliberately not locked: series are created with dict.setdefault
+# and counters are bumped in place, so the hot path allocates nothing after
+# warm-up. Under the GIL a lost increment is possible but rare, which is an
+# acceptable trade for metrics that stay on in production.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+# Every gunicorn worker keeps its own registry and a scrape lands on
+# whichever worker accepts the connection. With METRICS_MULTIPROC_DIR set
+# (a directory shared by the workers, emptied when the master starts) each
+# worker writes its samples to <dir>/<pid>.json every METRICS_FLUSH_SECONDS
+# and /metrics merges all files: counters and histograms are summed over
+# every worker, and gauges are reported per live worker with a pid label.
+# When a worker exits its counters are folded into <dir>/aggregate.json and
+# its own file is removed, so recycled workers do not pile up files. Without
+# it, scrape each worker directly or run a single worker.
+MULTIPROC_DIR = os.getenv('METRICS_MULTIPROC_DIR') or None
+FLUSH_SECONDS = float(os.getenv('METRICS_FLUSH_SECONDS', '5'))
+AGGREGATE_NAME = 'aggregate'
+
+_registry = []
+_flusher_pid = None
+_folded_pid = None
+
+
+def _format_labels(label_names, label_values, extra=None):
+    pairs = list(zip(label_names, label_values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    escaped = (
+        '%s="%s"' % (name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in pairs
+    )
+    return '{' + ','.join(escaped) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Counter monoton dengan label opsional, atau dibaca dari callback saat render"""
+
+    kind = 'counter'
+
+    def __init__(self, name, documentation, label_names=(), callback=None):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.callback = callback
+        self._series = {}
+        _registry.append(self)
+
+    def inc(self, label_values=(), amount=1):
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series.setdefault(label_values, [0])
+        series[0] += amount
+
+    def samples(self):
+        if self.callback is not None:
+            for label_values, value in self.callback():
+                yield self.name, _format_labels(self.label_names, label_values), value
+            return
+        for label_values, series in list(self._series.items()):
+            yield self.name, _format_labels(self.label_names, label_values), series[0]
+
+
+class Gauge(Counter):
+    """Nilai yang bisa naik turun, atau dibaca dari callback saat render"""
+
+    kind = 'gauge'
+
+    def dec(self, label_values=(), amount=1):
+        self.inc(label_values, -amount)
+
+    def set(self, label_values=(), value=0):
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series.setdefault(label_values, [0])
+        series[0] = value
+
+
+class Histogram:
+    """Histogram dengan bucket tetap dan label opsional"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, label_names=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        _registry.append(self)
+
+    def observe(self, label_values=(), value=0):
+        series = self._series.get(label_values)
+        if series is None:
+            # bucket counts, then +Inf, sum and count
+            series = self._series.setdefault(label_values, [0] * (len(self.buckets) + 3))
+        series[bisect_left(self.buckets, value)] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def samples(self):
+        for label_values, series in list(self._series.items()):
+            cumulative = 0
+            for i, bound in enumerate(self.buckets + (float('inf'),)):
+                cumulative += series[i]
+                labels = _format_labels(self.label_names, label_values, ('le', _format_value(bound)))
+                yield self.name + '_bucket', labels, cumulative
+            labels = _format_labels(self.label_names, label_values)
+            yield self.name + '_sum', labels, series[-2]
+            yield self.name + '_count', labels, series[-1]
+
+
+def _collect():
+    return [
+        {'name': metric.name, 'documentation': metric.documentation, 'kind': metric.kind,
+         'samples': list(metric.samples())}
+        for metric in _registry
+    ]
+
+
+def _format(metrics):
+    lines = []
+    for metric in metrics:
+        lines.append(f'# HELP {metric["name"]} {metric["documentation"]}')
+        lines.append(f'# TYPE {metric["name"]} {metric["kind"]}')
+        for name, labels, value in metric['samples']:
+            lines.append(f'{name}{labels} {_format_value(value)}')
+    return '\n'.join(lines) + '\n'
+
+
+def _with_pid(labels, pid):
+    if not labels:
+        return '{pid="%d"}' % pid
+    return '{pid="%d",%s' % (pid, labels[1:])
+
+
+def _is_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _path(name):
+    return os.path.join(MULTIPROC_DIR, f'{name}.json')
+
+
+@contextmanager
+def _locked(operation):
+    """Lock MULTIPROC_DIR: shared untuk tulis/baca snapshot, exclusive untuk fold"""
+    os.makedirs(MULTIPROC_DIR, exist_ok=True)
+    with open(os.path.join(MULTIPROC_DIR, '.lock'), 'a') as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, getattr(fcntl, operation))
+        yield
+
+
+def _read(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write(path, snapshot):
+    # Written under the pid of the writer, so two processes never share a tmp file
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(snapshot, f)
+    os.replace(tmp, path)
+
+
+def write_snapshot():
+    """Tulis sample proses ini ke MULTIPROC_DIR"""
+    with _locked('LOCK_SH'):
+        # The flusher thread may still run after worker_exit folded this
+        # process; writing again would count its samples twice
+        if _folded_pid != os.getpid():
+            _write(_path(os.getpid()), _collect())
+
+
+def fold_worker(pid=None):
+    """Gabungkan counter dan histogram worker yang selesai ke aggregate.json
+
+    Tanpa pid, sample diambil dari memori proses ini (worker_exit). Dengan
+    pid, dibaca dari file worker itu (child_exit di master, untuk worker yang
+    di-kill sebelum worker_exit). File per-PID lalu dihapus.
+    """
+    global _folded_pid
+    if not MULTIPROC_DIR:
+        return
+    own = pid is None
+    pid = os.getpid() if own else pid
+    with _locked('LOCK_EX'):
+        snapshot = _collect() if own else _read(_path(pid))
+        if snapshot is None:
+            return
+        aggregate = _read(_path(AGGREGATE_NAME)) or []
+        _write(_path(AGGREGATE_NAME), _merge([(None, aggregate), (None, snapshot)]))
+        try:
+            os.remove(_path(pid))
+        except FileNotFoundError:
+            pass
+        if own:
+            _folded_pid = pid
+
+
+def clear_multiproc_dir():
+    """Hapus snapshot lama, dipanggil master gunicorn saat start"""
+    if MULTIPROC_DIR:
+        os.makedirs(MULTIPROC_DIR, exist_ok=True)
+        for path in glob.glob(os.path.join(MULTIPROC_DIR, '*.json*')):
+            os.remove(path)
+
+
+def start_flusher():
+    """Jalankan thread yang menulis snapshot secara berkala (sekali per proses)"""
+    global _flusher_pid
+    if not MULTIPROC_DIR or _flusher_pid == os.getpid():
+        return
+    _flusher_pid = os.getpid()
+
+    def flush():
+        while True:
+            time.sleep(FLUSH_SECONDS)
+            try:
+                write_snapshot()
+            except OSError:
+                pass
+
+    threading.Thread(target=flush, name='metrics-flusher', daemon=True).start()
+
+
+def _merge(snapshots):
+    """Jumlahkan snapshot (pid, samples); gauge hanya dari pid yang tidak None"""
+    merged = {}
+    for pid, snapshot in snapshots:
+        for metric in snapshot:
+            if metric['kind'] == 'gauge' and pid is None:
+                continue
+            entry = merged.setdefault(metric['name'], dict(metric, samples={}))
+            for name, labels, value in metric['samples']:
+                if metric['kind'] == 'gauge':
+                    labels = _with_pid(labels, pid)
+                entry['samples'][(name, labels)] = entry['samples'].get((name, labels), 0) + value
+    return [
+        dict(metric, samples=[(name, labels, value) for (name, labels), value in metric['samples'].items()])
+        for metric in merged.values()
+    ]
+
+
+def _merged():
+    write_snapshot()
+    snapshots = []
+    # Shared lock so a worker being folded is counted either in its own file
+    # or in the aggregate, never both
+    with _locked('LOCK_SH'):
+        for path in glob.glob(os.path.join(MULTIPROC_DIR, '*.json')):
+            name = os.path.basename(path)[:-len('.json')]
+            snapshot = _read(path)
+            if snapshot is None:
+                continue
+            if name == AGGREGATE_NAME:
+                snapshots.append((None, snapshot))
+            elif name.isdigit():
+                pid = int(name)
+                snapshots.append((pid if _is_alive(pid) else None, snapshot))
+    return _merge(snapshots)
+
+
+def render():
+    """Render semua metric dalam format teks Prometheus, digabung antar worker jika diaktifkan"""
+    if MULTIPROC_DIR:
+        return _format(_merged())
+    return _format(_collect())
+
+
+cache_lookups = Counter(
+    'cmms_cache_lookups_total', 'In-process cache lookups by cache and result', ('cache', 'result')
+)
@@ -0,0 +1,182 @@
+from datetime import datetime, timedelta
+import hashlib
+import os
+import socket
+from bson import ObjectId, json_util
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from indexes import declared_indexes, sync_indexes
+from models.inventory import RECENT_TRANSACTIONS, Inventory
+from models.inventory_transaction import InventoryTransaction
+from models.event_log import EventLog
+from models.maintenance_rollup import MaintenanceRollup
+
+SCHEMA_COLLECTION = 'schema_version'
+SCHEMA_ID = 'schema'
+LOCK_SECONDS = int(os.getenv('BOOTSTRAP_LOCK_SECONDS', '600'))
+
+
+def legacy_transaction_id(item_id, index):
+    """_id ledger deterministik untuk transaksi embedded ke-index milik item"""
+    return ObjectId(hashlib.md5(f'{item_id}:{index}'.encode()).digest()[:12])
+
+
+def _insert_ignoring_duplicates(collection, documents):
+    """insert_many unordered yang mengabaikan dokumen yang sudah ada"""
+    try:
+        collection.insert_many(documents, ordered=False)
+    except BulkWriteError as e:
+        if any(error.get('code') != 11000 for error in e.details.get('writeErrors', [])):
+            raise
+
+
+def migrate_inventory_transactions(db, batch_size=1000):
+    """Pindahkan transaksi embedded inventory ke inventory_transactions
+
+    Setiap entry mendapat _id deterministik dari item dan posisinya di
+    array, jadi menjalankan ulang setelah crash tidak menggandakan ledger.
+    """
+    transaction_model = InventoryTransaction(db)
+    query = {'transactions_migrated': {'$ne': True}}
+    migrated_items = 0
+    migrated_transactions = 0
+
+    for item in db['inventory'].find(query, {'transactions': 1}):
+        # Entries carrying item_id were already written to the ledger. The
+        # array is not trimmed before migration, so positions are stable.
+        legacy = [
+            (index, t) for index, t in enumerate(item.get('transactions', []))
+            if 'item_id' not in t
+        ]
+        batch = []
+        for index, transaction in legacy:
+            entry = transaction_model.build_transaction(
+                item['_id'],
+                transaction.get('type'),
+                transaction.get('quantity_change'),
+                transaction.get('previous_quantity'),
+                transaction.get('new_quantity'),
+                transaction.get('notes', ''),
+                transaction.get('timestamp')
+            )
+            entry['_id'] = legacy_transaction_id(item['_id'], index)
+            batch.append(entry)
+            if len(batch) >= batch_size:
+                _insert_ignoring_duplicates(transaction_model.collection, batch)
+                batch = []
+        if batch:
+            _insert_ignoring_duplicates(transaction_model.collection, batch)
+
+        db['inventory'].update_one(
+            {'_id': item['_id']},
+            {
+                '$set': {'transactions_migrated': True},
+                '$push': {'transactions': {'$each': [], '$slice': -RECENT_TRANSACTIONS}}
+            }
+        )
+        migrated_items += 1
+        migrated_transactions += len(legacy)
+
+    return migrated_items, migrated_transactions
+
+
+# Data migrations in order; a version is recorded once its function succeeds.
+# Every function must be safe to run again after a crash halfway through.
+MIGRATIONS = [
+    (1, 'move embedded inventory transactions to the ledger', migrate_inventory_transactions),
+    (2, 'backfill materialized low-stock flags', lambda db: Inventory(db).repair_low_stock_flags()),
+    (3, 'build daily maintenance rollups', lambda db: MaintenanceRollup(db).rebuild()),
+    (4, 'create capped event log', lambda db: EventLog(db).ensure_capped())
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def index_fingerprint():
+    """Hash dari semua index yang dideklarasikan model"""
+    declared = {
+        collection_name: [index.document for index in indexes]
+        for collection_name, indexes in sorted(declared_indexes().items())
+    }
+    return hashlib.sha1(json_util.dumps(declared, sort_keys=True).encode()).hexdigest()
+
+
+def get_schema_state(db):
+    """Dokumen versi schema, atau dict kosong jika belum pernah bootstrap"""
+    return db[SCHEMA_COLLECTION].find_one({'_id': SCHEMA_ID}) or {}
+
+
+def _acquire_lock(db, owner):
+    now = datetime.utcnow()
+    try:
+        # Upsert creates the document on first run; when it exists but the
+        # lock is held the filter misses and the upsert hits the _id
+        db[SCHEMA_COLLECTION].update_one(
+            {'_id': SCHEMA_ID, '$or': [{'locked_until': {'$lt': now}}, {'locked_until': {'$exists': False}}]},
+            {'$set': {'locked_by': owner, 'locked_until': now + timedelta(seconds=LOCK_SECONDS)}},
+            upsert=True
+        )
+        return True
+    except DuplicateKeyError:
+        # The document exists and another process holds the lock
+        return False
+
+
+def _release_lock(db, owner):
+    db[SCHEMA_COLLECTION].update_one(
+        {'_id': SCHEMA_ID, 'locked_by': owner},
+        {'$unset': {'locked_by': '', 'locked_until': ''}}
+    )
+
+
+def bootstrap(db, force=False, log=print):
+    """Buat index dan jalankan migrasi yang belum tercatat
+
+    Aman dijalankan berulang dan dari beberapa proses sekaligus: pekerjaan
+    dilindungi lock di dokumen schema, dan index maupun migrasi yang sudah
+    tercatat dilewati. Mengembalikan dokumen schema terbaru, atau None jika
+    proses lain sedang menjalankan bootstrap.
+    """
+    owner = f'{socket.gethostname()}:{os.getpid()}'
+    if not _acquire_lock(db, owner):
+        log('Bootstrap already running in another process, skipping')
+        return None
+
+    try:
+        state = get_schema_state(db)
+        fingerprint = index_fingerprint()
+
+        if force or state.get('index_fingerprint') != fingerprint:
+            # One createIndexes command per collection for the missing indexes
+            report = sync_indexes(db)
+            created = sum(len(changes['missing']) for changes in report.values())
+            updated = sum(len(changes['changed']) for changes in report.values())
+            db[SCHEMA_COLLECTION].update_one(
+                {'_id': SCHEMA_ID},
+                {'$set': {'index_fingerprint': fingerprint, 'indexes_synced_at': datetime.utcnow()}}
+            )
+            log(f'Indexes synced, {created} created, {updated} updated')
+        else:
+            log('Indexes up to date')
+
+        version = 0 if force else state.get('version', 0)
+        for migration_version, description, migrate in MIGRATIONS:
+            if migration_version <= version:
+                continue
+            log(f'Applying migration {migration_version}: {description}')
+            migrate(db)
+            db[SCHEMA_COLLECTION].update_one(
+                {'_id': SCHEMA_ID},
+                {
+                    '$set': {'version': migration_version, 'migrated_at': datetime.utcnow()},
+                    '$push': {'history': {
+                        'version': migration_version,
+                        'description': description,
+                        'applied_at': datetime.utcnow()
+                    }}
+                }
+            )
+
+        log(f'Schema at version {SCHEMA_VERSION}')
+        return get_schema_state(db)
+    finally:
+        _release_lock(db, owner)
@@ -1,11 +1,17 @@
 from datetime import datetime
 from bson import ObjectId
+from pymongo import IndexModel
 
 class Audit:
     """Model untuk Audits"""
     
+    COLLECTION = 'audits'
+    INDEXES = [
+        IndexModel([('audit_number', 1)], unique=True)
+    ]
+    
     def __init__(self, db):
-        self.collection = db['audits']
+        self.collection = db[self.COLLECTION]
     
     def create_audit(self, data):
         """Buat audit baru"""
@@ -0,0 +1,32 @@
+from datetime import datetime
+
+class CollectionVersion:
+    """Model untuk versi per koleksi, naik setiap kali koleksi ditulis
+
+    Dipakai sebagai validator ETag list endpoint tanpa memindai koleksi.
+    """
+    
+    COLLECTION = 'collection_versions'
+    INDEXES = []
+    
+    def __init__(self, db):
+        self.collection = db[self.COLLECTION]
+    
+    def bump(self, collection_name):
+        """Naikkan versi koleksi setelah insert, update atau delete"""
+        self.collection.update_one(
+            {'_id': collection_name},
+            {'$inc': {'version': 1}, '$set': {'updated_at': datetime.utcnow()}},
+            upsert=True
+        )
+    
+    def get(self, collection_name):
+        """Versi koleksi sebagai (version, updated_at), (0, None) jika belum pernah ditulis"""
+        return self.parse(self.collection.find_one({'_id': collection_name}))
+    
+    @staticmethod
+    def parse(doc):
+        """Dokumen versi sebagai (version, updated_at), juga untuk hasil query async"""
+        if doc is None:
+            return 0, None
+        return doc.get('version', 0), doc.get('updated_at')
@@ -1,11 +1,21 @@
 from datetime import datetime
 from bson import ObjectId
+from pymongo import IndexModel
+from models.dashboard_stats import DashboardStats
+
+OVERDUE_PROJECTION = {'regulation': 1, 'category': 1, 'responsible_party': 1, 'due_date': 1}
 
 class Compliance:
     """Model untuk Compliance Tracking"""
     
+    COLLECTION = 'compliance'
+    INDEXES = [
+        IndexModel([('status', 1), ('due_date', 1)])
+    ]
+    
     def __init__(self, db):
-        self.collection = db['compliance']
+        self.collection = db[self.COLLECTION]
+        self.stats = DashboardStats(db)
     
     def create_compliance(self, data):
         """Buat record compliance baru"""
@@ -24,6 +34,7 @@ class Compliance:
             'updated_at': datetime.utcnow()
         }
         result = self.collection.insert_one(compliance)
+        self.stats.invalidate()
         return str(result.inserted_id)
     
     def update_compliance_status(self, compliance_id, status, evidence=None):
@@ -51,15 +62,41 @@ class Compliance:
                 {'$set': update_data}
             )
         
-        return result.modified_count > 0
+        if result.modified_count == 0:
+            return False
+        
+        self.stats.invalidate()
+        return True
     
     def get_overdue_compliance(self):
-        """Ambil compliance yang overdue"""
-        compliance = list(self.collection.find({
-            'due_date': {'$lt': datetime.utcnow()},
-            'status': {'$in': ['pending', 'overdue']}
-        }))
+        """Ambil compliance yang overdue (ditandai oleh sweeper)"""
+        compliance = list(self.collection.find({'status': 'overdue'}).sort('due_date', 1))
+        
+        return compliance
+    
+    def mark_overdue(self, now=None, batch_size=1000):
+        """Ubah satu batch compliance pending yang lewat due_date menjadi overdue
+
+        Mengembalikan record yang baru saja ditandai overdue; panggil ulang
+        sampai hasilnya lebih sedikit dari batch_size.
+        """
+        now = now or datetime.utcnow()
+        query = {'status': 'pending', 'due_date': {'$lt': now}}
+        overdue = list(
+            self.collection.find(query, OVERDUE_PROJECTION).sort('due_date', 1).limit(batch_size)
+        )
+        if not overdue:
+            return []
         
-        for c in compliance:
-            c['_id'] = str(c['_id'])
-        return compliance
\ No newline at end of file
+        ids = [record['_id'] for record in overdue]
+        result = self.collection.update_many(
+            {'_id': {'$in': ids}, 'status': 'pending'},
+            {'$set': {'status': 'overdue', 'overdue_since': now, 'updated_at': now}}
+        )
+        if result.modified_count < len(ids):
+            # Some were checked in between; report only what was flipped
+            flipped = {r['_id'] for r in self.collection.find({'_id': {'$in': ids}, 'overdue_since': now}, {'_id': 1})}
+            overdue = [record for record in overdue if record['_id'] in flipped]
+        if overdue:
+            self.stats.invalidate()
+        return overdue
\ No newline at end of file
@@ -1,15 +1,48 @@
 from datetime import datetime
 from bson import ObjectId
+from pymongo import IndexModel, ReturnDocument
+from pagination import paginate, parse_fields
+from models.dashboard_stats import DashboardStats
+from models.tombstone import Tombstone
+from models.collection_version import CollectionVersion
+from bulk_import import import_rows
+from entity_cache import NOT_PROBED, cached_by_id, entity_cache, version_by_id
+from text_search import TEXT_LANGUAGE, prefix_text_search, text_search
+
+# Embedded arrays are trimmed on list endpoints to keep responses bounded
+LIST_PROJECTION = {'condition_history': {'$slice': -20}}
 
 class Component:
     """Model untuk komponen mesin"""
     
+    COLLECTION = 'components'
+    INDEXES = [
+        IndexModel([('machine_id', 1), ('_id', 1)]),
+        IndexModel([('part_number', 1)]),
+        IndexModel([('condition', 1)]),
+        IndexModel([('updated_at', 1), ('_id', 1)]),
+        IndexModel(
+            [('name', 'text'), ('part_number', 'text')],
+            weights={'part_number': 10, 'name': 5},
+            default_language=TEXT_LANGUAGE,
+            name='components_text'
+        )
+    ]
+    
     def __init__(self, db):
-        self.collection = db['components']
+        self.collection = db[self.COLLECTION]
+        self.stats = DashboardStats(db)
+        self.tombstones = Tombstone(db)
+        self.versions = CollectionVersion(db)
     
-    def create_component(self, data):
-        """Buat komponen baru"""
-        component = {
+    def _track_critical(self, previous_condition, new_condition):
+        """Sesuaikan counter komponen kritis di ringkasan dashboard"""
+        delta = (new_condition == 'critical') - (previous_condition == 'critical')
+        self.stats.increment('critical_components', delta)
+    
+    def build_component(self, data):
+        """Susun dokumen komponen dari data input"""
+        return {
             'machine_id': data['machine_id'],
             'name': data['name'],
             'part_number': data['part_number'],
@@ -25,22 +58,47 @@ class Component:
             'created_at': datetime.utcnow(),
             'updated_at': datetime.utcnow()
         }
+    
+    def create_component(self, data):
+        """Buat komponen baru"""
+        component = self.build_component(data)
         result = self.collection.insert_one(component)
+        self.versions.bump(self.COLLECTION)
+        self._track_critical(None, component['condition'])
         return str(result.inserted_id)
     
-    def get_components_by_machine(self, machine_id):
-        """Ambil semua komponen berdasarkan mesin"""
-        components = list(self.collection.find({'machine_id': machine_id}))
-        for component in components:
-            component['_id'] = str(component['_id'])
-        return components
+    def bulk_create_components(self, rows, batch_size=None):
+        """Import banyak komponen sekaligus, mengembalikan laporan per baris"""
+        def on_inserted(docs):
+            self.versions.bump(self.COLLECTION)
+            critical = sum(1 for doc in docs if doc['condition'] == 'critical')
+            self.stats.increment('critical_components', critical)
+        
+        return import_rows(self.collection, rows, self.build_component, batch_size, on_inserted)
+    
+    def get_components_by_machine(self, machine_id, limit=None, after=None, fields=None):
+        """Ambil komponen berdasarkan mesin, mengembalikan (components, next_cursor)"""
+        projection = parse_fields(fields) or LIST_PROJECTION
+        return paginate(self.collection, {'machine_id': machine_id}, limit=limit,
+                        after=after, projection=projection)
+    
+    def search(self, q, filters=None, skip=0, limit=20):
+        """Cari komponen di name dan part_number, mengembalikan (hasil, has_more)
+
+        Query satu kata juga dicocokkan sebagai prefix part_number.
+        """
+        if ' ' in q:
+            return text_search(self.collection, q, filters, LIST_PROJECTION, skip, limit)
+        trim = {'$set': {'condition_history': {'$slice': [{'$ifNull': ['$condition_history', []]}, -20]}}}
+        return prefix_text_search(self.collection, q, 'part_number', filters, skip, limit, [trim])
     
-    def get_component_by_id(self, component_id):
+    def get_component_by_id(self, component_id, expected_version=NOT_PROBED):
         """Ambil komponen berdasarkan ID"""
-        component = self.collection.find_one({'_id': ObjectId(component_id)})
-        if component:
-            component['_id'] = str(component['_id'])
-        return component
+        return cached_by_id(self.collection, component_id, expected_version)
+    
+    def get_component_version(self, component_id):
+        """Versi komponen untuk ETag, mengembalikan (ada, updated_at)"""
+        return version_by_id(self.collection, component_id)
     
     def update_component(self, component_id, data):
         """Update data komponen (partial allowed)"""
@@ -48,15 +106,24 @@ class Component:
         # do not allow changing _id
         if '_id' in data:
             data.pop('_id')
-        result = self.collection.update_one(
+        previous = self.collection.find_one_and_update(
             {'_id': ObjectId(component_id)},
-            {'$set': data}
+            {'$set': data},
+            projection={'condition': 1},
+            return_document=ReturnDocument.BEFORE
         )
-        return result.modified_count > 0
+        entity_cache.invalidate(self.COLLECTION, component_id)
+        if not previous:
+            return False
+        
+        self.versions.bump(self.COLLECTION)
+        if 'condition' in data:
+            self._track_critical(previous.get('condition'), data['condition'])
+        return True
     
     def update_condition(self, component_id, condition, notes=''):
         """Update kondisi komponen"""
-        result = self.collection.update_one(
+        previous = self.collection.find_one_and_update(
             {'_id': ObjectId(component_id)},
             {
                 '$set': {
@@ -71,11 +138,29 @@ class Component:
                         'timestamp': datetime.utcnow()
                     }
                 }
-            }
+            },
+            projection={'condition': 1},
+            return_document=ReturnDocument.BEFORE
         )
-        return result.modified_count > 0
+        entity_cache.invalidate(self.COLLECTION, component_id)
+        if not previous:
+            return False
+        
+        self.versions.bump(self.COLLECTION)
+        self._track_critical(previous.get('condition'), condition)
+        return True
 
     def delete_component(self, component_id):
         """Hapus komponen"""
-        result = self.collection.delete_one({'_id': ObjectId(component_id)})
-        return result.deleted_count > 0
\ No newline at end of file
+        deleted = self.collection.find_one_and_delete(
+            {'_id': ObjectId(component_id)},
+            projection={'condition': 1}
+        )
+        entity_cache.invalidate(self.COLLECTION, component_id)
+        if not deleted:
+            return False
+        
+        self.tombstones.record(self.COLLECTION, component_id)
+        self.versions.bump(self.COLLECTION)
+        self._track_critical(deleted.get('condition'), None)
+        return True
\ No newline at end of file
@@ -0,0 +1,115 @@
+from datetime import datetime, timedelta
+import os
+import threading
+import time
+from fanout import DEFAULT_TIMEOUT as FANOUT_TIMEOUT, run_parallel
+from metrics import cache_lookups
+
+ACTIVE_WORK_ORDER_STATUSES = ['pending', 'in_progress']
+SUMMARY_ID = 'dashboard'
+
+# Counters that only change through writes are kept current with $inc; the
+# time-window counters (upcoming, overdue) are refreshed by recomputation.
+STALENESS_SECONDS = int(os.getenv('DASHBOARD_STALENESS_SECONDS', '60'))
+CACHE_TTL_SECONDS = float(os.getenv('DASHBOARD_CACHE_TTL_SECONDS', '5'))
+
+_cache = {'stats': None, 'expires': 0.0}
+_cache_lock = threading.Lock()
+
+
+class DashboardStats:
+    """Model untuk ringkasan statistik dashboard"""
+
+    COLLECTION = 'summaries'
+    INDEXES = []
+
+    def __init__(self, db):
+        self.db = db
+        self.collection = db[self.COLLECTION]
+
+    def increment(self, counter, amount=1):
+        """Ubah satu counter di dokumen ringkasan"""
+        if not amount:
+            return
+        # No upsert: a missing summary is rebuilt by the next recompute
+        self.collection.update_one({'_id': SUMMARY_ID}, {'$inc': {counter: amount}})
+        invalidate_cache()
+
+    def invalidate(self):
+        """Paksa ringkasan dihitung ulang pada pembacaan berikutnya"""
+        self.collection.update_one({'_id': SUMMARY_ID}, {'$set': {'computed_at': datetime.min}})
+        invalidate_cache()
+
+    def count_all(self, timeout=None):
+        """Hitung semua counter langsung dari koleksi secara paralel
+
+        Mengembalikan tuple (stats, errors); counter yang gagal atau melewati
+        deadline tidak ada di stats.
+        """
+        db = self.db
+        now = datetime.utcnow()
+        max_time_ms = int((timeout or FANOUT_TIMEOUT) * 1000)
+
+        def count(collection, query):
+            return lambda: db[collection].count_documents(query, maxTimeMS=max_time_ms)
+
+        return run_parallel({
+            'total_machines': count('machines', {}),
+            'active_work_orders': count('work_orders', {
+                'status': {'$in': ACTIVE_WORK_ORDER_STATUSES}
+            }),
+            'upcoming_maintenance': count('maintenance_schedules', {
+                'next_scheduled': {'$lte': now + timedelta(days=7)},
+                'status': 'scheduled'
+            }),
+            'low_stock_items': count('inventory', {'is_low_stock': True}),
+            'critical_components': count('components', {'condition': 'critical'}),
+            'overdue_compliance': count('compliance', {'status': 'overdue'})
+        }, timeout)
+
+    def recompute(self, timeout=None):
+        """Hitung ulang dan simpan dokumen ringkasan
+
+        Hasil parsial dikembalikan dengan flag partial dan tidak disimpan.
+        """
+        stats, errors = self.count_all(timeout)
+        if errors:
+            return dict(stats, partial=True, errors=errors)
+
+        self.collection.replace_one(
+            {'_id': SUMMARY_ID},
+            dict(stats, computed_at=datetime.utcnow()),
+            upsert=True
+        )
+        return stats
+
+    def get_stats(self, max_age=None, fresh=False, timeout=None):
+        """Ambil statistik dashboard dengan satu read dari ringkasan"""
+        max_age = STALENESS_SECONDS if max_age is None else max_age
+        if not fresh:
+            with _cache_lock:
+                if _cache['stats'] is not None and _cache['expires'] > time.monotonic():
+                    cache_lookups.inc(('dashboard', 'hit'))
+                    return dict(_cache['stats'])
+            cache_lookups.inc(('dashboard', 'miss'))
+
+        summary = None if fresh else self.collection.find_one({'_id': SUMMARY_ID})
+        if summary and summary.get('computed_at', datetime.min) >= datetime.utcnow() - timedelta(seconds=max_age):
+            summary.pop('_id')
+            stats = summary
+        else:
+            stats = dict(self.recompute(timeout), computed_at=datetime.utcnow())
+            if stats.get('partial'):
+                return stats
+
+        with _cache_lock:
+            _cache['stats'] = stats
+            _cache['expires'] = time.monotonic() + CACHE_TTL_SECONDS
+        return dict(stats)
+
+
+def invalidate_cache():
+    """Kosongkan cache statistik di proses ini"""
+    with _cache_lock:
+        _cache['stats'] = None
+        _cache['expires'] = 0.0
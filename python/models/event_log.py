@@ -0,0 +1,75 @@
+from datetime import datetime
+import logging
+import os
+from pymongo import ReturnDocument
+from pymongo.errors import CollectionInvalid, PyMongoError
+
+logger = logging.getLogger(__name__)
+
+# Capped so the log never needs cleaning and can be tailed without an index
+CAPPED_BYTES = int(os.getenv('EVENT_LOG_BYTES', str(16 * 1024 * 1024)))
+
+class EventLog:
+    """Model untuk log event bersama (capped collection) antar proses"""
+    
+    COLLECTION = 'event_log'
+    SEQUENCE_COLLECTION = 'event_log_sequence'
+    INDEXES = []
+    
+    def __init__(self, db):
+        self.db = db
+        self.collection = db[self.COLLECTION]
+        self.sequence = db[self.SEQUENCE_COLLECTION]
+    
+    def _next_id(self):
+        # ObjectIds from different processes do not sort in write order,
+        # a shared counter gives event IDs clients can resume from
+        counter = self.sequence.find_one_and_update(
+            {'_id': self.COLLECTION},
+            {'$inc': {'value': 1}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        return counter['value']
+    
+    def ensure_capped(self):
+        """Buat capped collection event log, atau konversi jika sudah ada tanpa capped
+
+        Mengembalikan True jika collection dibuat atau dikonversi, False jika
+        sudah capped.
+        """
+        try:
+            self.db.create_collection(self.COLLECTION, capped=True, size=CAPPED_BYTES)
+            return True
+        except CollectionInvalid:
+            pass
+        if self.is_capped():
+            return False
+        # Left uncapped by an older deploy or a write before bootstrap; keeps
+        # the newest events that fit in CAPPED_BYTES
+        self.db.command('convertToCapped', self.COLLECTION, size=CAPPED_BYTES)
+        return True
+    
+    def is_capped(self):
+        return bool(self.collection.options().get('capped'))
+    
+    def record(self, event_type, payload):
+        """Catat satu event; kegagalan hanya di-log agar write asal tetap sukses"""
+        try:
+            self.collection.insert_one({
+                '_id': self._next_id(),
+                'type': event_type,
+                'payload': payload,
+                'created_at': datetime.utcnow()
+            })
+        except PyMongoError:
+            logger.exception('Failed to record event %s', event_type)
+    
+    def get_oldest_id(self):
+        """ID event tertua yang masih ada di capped log, atau None"""
+        oldest = self.collection.find_one(sort=[('_id', 1)], projection={'_id': 1})
+        return oldest['_id'] if oldest else None
+    
+    def get_events_after(self, event_id, limit):
+        """Event dengan ID lebih besar dari event_id, untuk replay"""
+        return list(self.collection.find({'_id': {'$gt': event_id}}).sort('_id', 1).limit(limit))
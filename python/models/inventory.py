@@ -1,11 +1,45 @@
-from datetime import datetime
+from datetime import datetime, timedelta
+import hashlib
 from bson import ObjectId
+from pymongo import IndexModel, ReturnDocument, UpdateOne
+from models.inventory_transaction import InventoryTransaction
+from models.dashboard_stats import DashboardStats
+from models.event_log import EventLog
+
+# Item documents only keep the latest movements, the full ledger lives in
+# the inventory_transactions collection
+RECENT_TRANSACTIONS = 10
+# Reservation lines are stamped here, keyed by reference, until their ledger
+# entries are written; leftovers mark a reservation interrupted by a crash
+PENDING_FIELD = 'pending_reservations'
+
+def low_stock_fields(quantity='$quantity', min_stock='$min_stock'):
+    """Ekspresi flag is_low_stock dan stock_deficit untuk pipeline update"""
+    return {
+        'is_low_stock': {'$lte': [quantity, min_stock]},
+        'stock_deficit': {'$max': [0, {'$subtract': [min_stock, quantity]}]}
+    }
 
 class Inventory:
     """Model untuk Maintenance Inventory"""
     
+    COLLECTION = 'inventory'
+    INDEXES = [
+        IndexModel([('part_number', 1)], unique=True),
+        IndexModel([('is_low_stock', 1), ('stock_deficit', -1)])
+    ]
+    
     def __init__(self, db):
-        self.collection = db['inventory']
+        self.collection = db[self.COLLECTION]
+        self.transactions = InventoryTransaction(db)
+        self.stats = DashboardStats(db)
+        self.events = EventLog(db)
+    
+    def _track_low_stock(self, was_low, is_low, item_id=None):
+        """Sesuaikan counter low stock di ringkasan dashboard, alert jika baru low"""
+        self.stats.increment('low_stock_items', bool(is_low) - bool(was_low))
+        if item_id is not None and is_low and not was_low:
+            self.events.record('inventory.low_stock', {'item_id': str(item_id)})
     
     def create_item(self, data):
         """Buat item inventory baru"""
@@ -17,6 +51,8 @@ class Inventory:
             'quantity': data['quantity'],
             'unit': data['unit'],
             'min_stock': data.get('min_stock', 0),
+            'is_low_stock': data['quantity'] <= data.get('min_stock', 0),
+            'stock_deficit': max(0, data.get('min_stock', 0) - data['quantity']),
             'max_stock': data.get('max_stock', 0),
             'location': data.get('location', ''),
             'supplier': data.get('supplier', ''),
@@ -25,56 +61,244 @@ class Inventory:
             'compatible_components': data.get('compatible_components', []),
             'last_restock': None,
             'transactions': [],
+            'transactions_migrated': True,
             'created_at': datetime.utcnow(),
             'updated_at': datetime.utcnow()
         }
         result = self.collection.insert_one(item)
+        self._track_low_stock(False, item['is_low_stock'])
         return str(result.inserted_id)
     
-    def update_quantity(self, item_id, quantity_change, transaction_type, notes=''):
-        """Update quantity dengan tracking transaksi"""
-        item = self.collection.find_one({'_id': ObjectId(item_id)})
-        
-        if not item:
-            return False
-        
-        new_quantity = item['quantity'] + quantity_change
-        
-        if new_quantity < 0:
-            return False
-        
-        transaction = {
-            'type': transaction_type,  # in, out, adjustment
-            'quantity_change': quantity_change,
-            'previous_quantity': item['quantity'],
+    def _quantity_pipeline(self, item_id, quantity_change, transaction_type, notes,
+                           timestamp, reference=None, lines=None):
+        """Pipeline update quantity atomik beserta entry transaksi terbaru"""
+        new_quantity = {'$add': ['$quantity', quantity_change]}
+        entry = {
+            'item_id': {'$literal': str(item_id)},
+            'type': {'$literal': transaction_type},
+            'quantity_change': {'$literal': quantity_change},
+            'previous_quantity': '$quantity',
             'new_quantity': new_quantity,
-            'notes': notes,
-            'timestamp': datetime.utcnow()
+            'notes': {'$literal': notes},
+            'timestamp': {'$literal': timestamp}
         }
+        if reference:
+            entry['reference'] = {'$literal': reference}
         
+        transactions = {'$concatArrays': [{'$ifNull': ['$transactions', []]}, [entry]]}
         update_data = {
             'quantity': new_quantity,
-            'updated_at': datetime.utcnow()
+            'updated_at': {'$literal': timestamp},
+            # Legacy items keep their embedded ledger until it has been migrated
+            'transactions': {'$cond': [
+                {'$eq': ['$transactions_migrated', True]},
+                {'$slice': [transactions, -RECENT_TRANSACTIONS]},
+                transactions
+            ]}
         }
-        
         if transaction_type == 'in':
-            update_data['last_restock'] = datetime.utcnow()
+            update_data['last_restock'] = {'$literal': timestamp}
+        if reference:
+            update_data[f'{PENDING_FIELD}.{reference}'] = dict(entry, lines={'$literal': lines})
+        update_data.update(low_stock_fields(new_quantity))
         
-        result = self.collection.update_one(
+        return [{'$set': update_data}]
+    
+    def update_item(self, item_id, data):
+        """Update data item (partial allowed), quantity lewat update_quantity"""
+        for field in ('_id', 'quantity', 'transactions', 'is_low_stock', 'stock_deficit', 'created_at'):
+            data.pop(field, None)
+        data['updated_at'] = datetime.utcnow()
+        
+        update_data = {field: {'$literal': value} for field, value in data.items()}
+        previous = self.collection.find_one_and_update(
             {'_id': ObjectId(item_id)},
-            {
-                '$set': update_data,
-                '$push': {'transactions': transaction}
-            }
+            [{'$set': update_data}, {'$set': low_stock_fields()}],
+            projection={'quantity': 1, 'min_stock': 1, 'is_low_stock': 1},
+            return_document=ReturnDocument.BEFORE
         )
-        return result.modified_count > 0
+        if not previous:
+            return False
+        
+        min_stock = data.get('min_stock', previous.get('min_stock', 0))
+        self._track_low_stock(previous.get('is_low_stock'), previous.get('quantity', 0) <= min_stock, item_id)
+        return True
+    
+    def repair_low_stock_flags(self):
+        """Hitung ulang is_low_stock/stock_deficit untuk semua item"""
+        result = self.collection.update_many({}, [{'$set': low_stock_fields()}])
+        self.stats.invalidate()
+        return result.modified_count
+    
+    def _quantity_filter(self, item_id, quantity_change):
+        """Filter yang hanya cocok jika stock cukup"""
+        query = {'_id': ObjectId(item_id)}
+        if quantity_change < 0:
+            query['quantity'] = {'$gte': -quantity_change}
+        return query
+    
+    def update_quantity(self, item_id, quantity_change, transaction_type, notes=''):
+        """Update quantity secara atomik, mengembalikan item terbaru atau None"""
+        if isinstance(quantity_change, bool) or not isinstance(quantity_change, (int, float)):
+            raise ValueError('quantity_change must be a number')
+        
+        now = datetime.utcnow()
+        item = self.collection.find_one_and_update(
+            self._quantity_filter(item_id, quantity_change),
+            self._quantity_pipeline(item_id, quantity_change, transaction_type, notes, now),
+            projection={'transactions': 0, PENDING_FIELD: 0},
+            return_document=ReturnDocument.AFTER
+        )
+        
+        if not item:
+            return None
+        
+        was_low = item['quantity'] - quantity_change <= item.get('min_stock', 0)
+        self._track_low_stock(was_low, item.get('is_low_stock'), item_id)
+        self.transactions.record(self.transactions.build_transaction(
+            item_id, transaction_type, quantity_change,
+            item['quantity'] - quantity_change, item['quantity'], notes, now
+        ))
+        return item
+    
+    def _apply_reference(self, quantities, transaction_type, notes, reference, lines=None):
+        """Update quantity banyak item dalam satu bulk_write
+
+        Mengembalikan (entry yang berhasil, {item_id: (was_low, is_low)}).
+        Setiap update yang lolos guard stock menyimpan entry-nya di
+        PENDING_FIELD.<reference>, jadi semuanya dibaca balik dengan satu find.
+        """
+        now = datetime.utcnow()
+        self.collection.bulk_write([
+            UpdateOne(
+                self._quantity_filter(item_id, change),
+                self._quantity_pipeline(item_id, change, transaction_type, notes, now, reference, lines)
+            )
+            for item_id, change in quantities.items()
+        ], ordered=False)
+        
+        pending = f'{PENDING_FIELD}.{reference}'
+        applied = []
+        low_stock = {}
+        for item in self.collection.find(
+            {'_id': {'$in': [ObjectId(item_id) for item_id in quantities]}, pending: {'$exists': True}},
+            {pending: 1, 'min_stock': 1}
+        ):
+            entry = item[PENDING_FIELD][reference]
+            applied.append(entry)
+            min_stock = item.get('min_stock', 0)
+            low_stock[entry['item_id']] = (entry['previous_quantity'] <= min_stock, entry['new_quantity'] <= min_stock)
+        return applied, low_stock
+    
+    def _finish_reservation(self, reference, entries):
+        """Tulis entry ke ledger (idempoten) lalu hapus penanda pending"""
+        if not entries:
+            return
+        ledger = []
+        for entry in entries:
+            entry.pop('lines', None)
+            entry_id = hashlib.md5(f"{entry['reference']}:{entry['item_id']}".encode()).digest()[:12]
+            ledger.append(dict(entry, _id=ObjectId(entry_id)))
+        self.transactions.record_many(ledger)
+        self.collection.update_many(
+            {'_id': {'$in': list({ObjectId(entry['item_id']) for entry in entries})}},
+            {'$unset': {f'{PENDING_FIELD}.{reference}': '', f'{PENDING_FIELD}.{reference}:rollback': ''}}
+        )
+    
+    def _release(self, reserved, notes, reference):
+        """Kembalikan stock line yang sudah terpasang"""
+        rollback = {entry['item_id']: -entry['quantity_change'] for entry in reserved}
+        if not rollback:
+            return []
+        released, _ = self._apply_reference(rollback, 'adjustment', notes, reference + ':rollback')
+        return released
+    
+    def reserve_parts(self, work_order_id, parts):
+        """Reservasi parts untuk satu work order (semua atau tidak sama sekali)
+
+        Mengembalikan tuple (reserved, failed) berisi entry transaksi yang
+        tercatat dan item_id yang stock-nya tidak cukup. ValueError jika
+        input tidak valid.
+        """
+        if not isinstance(parts, list):
+            raise ValueError('parts must be a list')
+        quantities = {}
+        for part in parts:
+            if not isinstance(part, dict):
+                raise ValueError('each part must be an object')
+            quantity = part.get('quantity')
+            if isinstance(quantity, bool) or not isinstance(quantity, (int, float)) or quantity <= 0:
+                raise ValueError('quantity must be a positive number')
+            item_id = part.get('item_id')
+            if not isinstance(item_id, str) or not ObjectId.is_valid(item_id):
+                raise ValueError('item_id must be a valid id')
+            quantities[item_id] = quantities.get(item_id, 0) + quantity
+        
+        if not quantities:
+            return [], []
+        
+        reference = str(ObjectId())
+        notes = f'Reserved for work order {work_order_id}'
+        reserved, low_stock = self._apply_reference(
+            {item_id: -quantity for item_id, quantity in quantities.items()},
+            'out', notes, reference, len(quantities)
+        )
+        
+        failed = set(quantities) - {entry['item_id'] for entry in reserved}
+        if failed:
+            # Release what was taken so the work order is not half reserved
+            reserved += self._release(
+                reserved, f'Reservation released for work order {work_order_id}', reference
+            )
+        self._finish_reservation(reference, reserved)
+        
+        if failed:
+            if reserved:
+                self.stats.invalidate()
+            return [], sorted(failed)
+        # Alert only once the reservation stands, not for a rolled back dip
+        for item_id, (was_low, is_low) in low_stock.items():
+            self._track_low_stock(was_low, is_low, item_id)
+        return reserved, []
+    
+    def release_stale_reservations(self, max_age_seconds=300):
+        """Selesaikan reservasi yang terputus (proses mati sebelum selesai)
+
+        Reservasi yang ledger-nya sudah mulai ditulis atau yang semua
+        line-nya terpasang dipertahankan, sisanya dikembalikan. Mengembalikan
+        (jumlah reservasi dipertahankan, jumlah yang dikembalikan).
+        """
+        cutoff = datetime.utcnow() - timedelta(seconds=max_age_seconds)
+        groups = {}
+        for item in self.collection.find({PENDING_FIELD: {'$exists': True}}, {PENDING_FIELD: 1}):
+            for key, entry in (item.get(PENDING_FIELD) or {}).items():
+                if entry['timestamp'] <= cutoff:
+                    groups.setdefault(key.split(':')[0], []).append(entry)
+        
+        kept = released = 0
+        for reference, entries in groups.items():
+            outs = [entry for entry in entries if entry['reference'] == reference]
+            rolled_back = {entry['item_id'] for entry in entries if entry['reference'] != reference}
+            # The ledger is written only after the outcome is settled
+            settled = self.transactions.collection.find_one({'reference': {'$in': [reference, reference + ':rollback']}})
+            if settled or (outs and len(outs) == outs[0].get('lines') and not rolled_back):
+                kept += 1
+            else:
+                entries += self._release(
+                    [entry for entry in outs if entry['item_id'] not in rolled_back],
+                    'Interrupted reservation released', reference
+                )
+                released += 1
+            self._finish_reservation(reference, entries)
+        if groups:
+            self.stats.invalidate()
+        return kept, released
     
     def get_low_stock_items(self):
         """Ambil item dengan stock rendah"""
-        items = list(self.collection.find({
-            '$expr': {'$lte': ['$quantity', '$min_stock']}
-        }))
+        items = list(self.collection.find(
+            {'is_low_stock': True},
+            {'transactions': 0, PENDING_FIELD: 0}
+        ).sort('stock_deficit', -1))
         
-        for item in items:
-            item['_id'] = str(item['_id'])
         return items
\ No newline at end of file
@@ -0,0 +1,47 @@
+from datetime import datetime
+from pymongo import IndexModel
+from pymongo.errors import BulkWriteError
+from pagination import paginate
+
+class InventoryTransaction:
+    """Model untuk ledger transaksi inventory (append-only)"""
+    
+    COLLECTION = 'inventory_transactions'
+    INDEXES = [
+        IndexModel([('item_id', 1), ('timestamp', -1), ('_id', -1)]),
+        IndexModel([('timestamp', 1)]),
+        IndexModel([('reference', 1)], sparse=True)
+    ]
+    
+    def __init__(self, db):
+        self.collection = db[self.COLLECTION]
+    
+    def build_transaction(self, item_id, transaction_type, quantity_change,
+                          previous_quantity, new_quantity, notes='', timestamp=None):
+        """Buat dokumen transaksi"""
+        return {
+            'item_id': str(item_id),
+            'type': transaction_type,  # in, out, adjustment
+            'quantity_change': quantity_change,
+            'previous_quantity': previous_quantity,
+            'new_quantity': new_quantity,
+            'notes': notes,
+            'timestamp': timestamp or datetime.utcnow()
+        }
+    
+    def record(self, transaction):
+        """Simpan transaksi ke ledger"""
+        result = self.collection.insert_one(transaction)
+        return str(result.inserted_id)
+    
+    def record_many(self, transactions):
+        """Simpan banyak transaksi, _id yang sudah ada dilewati (aman diulang)"""
+        try:
+            self.collection.insert_many(transactions, ordered=False)
+        except BulkWriteError as e:
+            if any(error.get('code') != 11000 for error in e.details.get('writeErrors', [])):
+                raise
+    
+    def get_ledger(self, item_id, limit=None, after=None):
+        """Ambil ledger item terbaru dulu, mengembalikan (transactions, next_cursor)"""
+        return paginate(self.collection, {'item_id': item_id}, 'timestamp', -1, limit, after)
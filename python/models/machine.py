@@ -1,15 +1,37 @@
 from datetime import datetime
 from bson import ObjectId
+from pymongo import IndexModel, ReturnDocument
+from pagination import paginate, parse_fields
+from models.dashboard_stats import DashboardStats
+from models.tombstone import Tombstone
+from models.collection_version import CollectionVersion
+from models.event_log import EventLog
+from bulk_import import import_rows
+from entity_cache import NOT_PROBED, cached_by_id, entity_cache, version_by_id
+
+# Embedded arrays are trimmed on list endpoints to keep responses bounded
+LIST_PROJECTION = {'components': {'$slice': 20}}
 
 class Machine:
     """Model untuk mesin Hyundai"""
     
+    COLLECTION = 'machines'
+    INDEXES = [
+        IndexModel([('serial_number', 1)], unique=True),
+        IndexModel([('location', 1), ('status', 1), ('_id', 1)]),
+        IndexModel([('updated_at', 1), ('_id', 1)])
+    ]
+    
     def __init__(self, db):
-        self.collection = db['machines']
+        self.collection = db[self.COLLECTION]
+        self.stats = DashboardStats(db)
+        self.tombstones = Tombstone(db)
+        self.versions = CollectionVersion(db)
+        self.events = EventLog(db)
     
-    def create_machine(self, data):
-        """Buat mesin baru"""
-        machine = {
+    def build_machine(self, data):
+        """Susun dokumen mesin dari data input"""
+        return {
             'name': data['name'],
             'model': data['model'],
             'serial_number': data['serial_number'],
@@ -22,33 +44,66 @@ class Machine:
             'created_at': datetime.utcnow(),
             'updated_at': datetime.utcnow()
         }
+    
+    def create_machine(self, data):
+        """Buat mesin baru"""
+        machine = self.build_machine(data)
         result = self.collection.insert_one(machine)
+        self.versions.bump(self.COLLECTION)
+        self.stats.increment('total_machines')
         return str(result.inserted_id)
     
-    def get_all_machines(self):
-        """Ambil semua mesin"""
-        machines = list(self.collection.find())
-        for machine in machines:
-            machine['_id'] = str(machine['_id'])
-        return machines
+    def bulk_create_machines(self, rows, batch_size=None):
+        """Import banyak mesin sekaligus, mengembalikan laporan per baris"""
+        def on_inserted(docs):
+            self.versions.bump(self.COLLECTION)
+            self.stats.increment('total_machines', len(docs))
+        
+        return import_rows(self.collection, rows, self.build_machine, batch_size, on_inserted)
     
-    def get_machine_by_id(self, machine_id):
+    def get_all_machines(self, limit=None, after=None, fields=None):
+        """Ambil mesin per halaman, mengembalikan (machines, next_cursor)"""
+        projection = parse_fields(fields) or LIST_PROJECTION
+        return paginate(self.collection, limit=limit, after=after, projection=projection)
+    
+    def get_machine_by_id(self, machine_id, expected_version=NOT_PROBED):
         """Ambil mesin berdasarkan ID"""
-        machine = self.collection.find_one({'_id': ObjectId(machine_id)})
-        if machine:
-            machine['_id'] = str(machine['_id'])
-        return machine
+        return cached_by_id(self.collection, machine_id, expected_version)
+    
+    def get_machine_version(self, machine_id):
+        """Versi mesin untuk ETag, mengembalikan (ada, updated_at)"""
+        return version_by_id(self.collection, machine_id)
     
     def update_machine(self, machine_id, data):
         """Update data mesin"""
         data['updated_at'] = datetime.utcnow()
-        result = self.collection.update_one(
+        previous = self.collection.find_one_and_update(
             {'_id': ObjectId(machine_id)},
-            {'$set': data}
+            {'$set': data},
+            projection={'status': 1},
+            return_document=ReturnDocument.BEFORE
         )
-        return result.modified_count > 0
+        entity_cache.invalidate(self.COLLECTION, machine_id)
+        if not previous:
+            return False
+        
+        self.versions.bump(self.COLLECTION)
+        if 'status' in data and data['status'] != previous.get('status'):
+            self.events.record('machine.status', {
+                'machine_id': machine_id,
+                'previous_status': previous.get('status'),
+                'status': data['status']
+            })
+        return True
     
     def delete_machine(self, machine_id):
         """Hapus mesin"""
         result = self.collection.delete_one({'_id': ObjectId(machine_id)})
-        return result.deleted_count > 0
\ No newline at end of file
+        entity_cache.invalidate(self.COLLECTION, machine_id)
+        if result.deleted_count == 0:
+            return False
+        
+        self.tombstones.record(self.COLLECTION, machine_id)
+        self.versions.bump(self.COLLECTION)
+        self.stats.increment('total_machines', -1)
+        return True
\ No newline at end of file
@@ -1,50 +1,140 @@
-from datetime import datetime
+from datetime import datetime, timezone
+import math
 from bson import ObjectId
+from dateutil import parser as date_parser
+from pymongo import IndexModel
+from streaming import STREAM_BATCH_SIZE
+from database import read_collection
+from models.maintenance_rollup import OUTCOMES, MaintenanceRollup
+from bulk_import import import_rows
+from text_search import TEXT_LANGUAGE, text_search
+
+def parse_performed_at(value):
+    """Normalisasi performed_at ke datetime UTC naive"""
+    if value is None:
+        return datetime.utcnow()
+    if isinstance(value, str):
+        value = date_parser.isoparse(value)
+    if not isinstance(value, datetime):
+        raise ValueError('performed_at must be a date')
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def parse_amount(data, field):
+    """Ambil field angka non-negatif (default 0), string angka ikut dikonversi
+
+    JSON dan NDJSON bisa membawa "12.5" seperti CSV, jadi konversi di sini
+    berlaku untuk semua format input.
+    """
+    value = data.get(field)
+    if isinstance(value, str):
+        value = value.strip()
+        try:
+            value = (float(value) if '.' in value else int(value)) if value else None
+        except ValueError:
+            raise ValueError(f'{field} must be a non-negative number')
+    if value is None:
+        return 0
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value) or value < 0:
+        raise ValueError(f'{field} must be a non-negative number')
+    return value
+
+
+def parse_key(data, field):
+    """Field kunci rollup (machine_id, maintenance_type) harus string tidak kosong
+
+    Nilai list/dict tidak bisa di-hash sebagai kunci rollup, jadi ditolak di
+    sini sebagai error per baris, bukan TypeError setelah insert.
+    """
+    value = data[field]
+    if not isinstance(value, str) or not value.strip():
+        raise ValueError(f'{field} must be a non-empty string')
+    return value
+
+
+def parse_outcome(value):
+    if value not in OUTCOMES:
+        raise ValueError('outcome must be one of: ' + ', '.join(OUTCOMES))
+    return value
+
 
 class MaintenanceHistory:
     """Model untuk Maintenance History"""
     
+    COLLECTION = 'maintenance_history'
+    INDEXES = [
+        IndexModel([('machine_id', 1), ('performed_at', -1)]),
+        IndexModel([('component_id', 1), ('performed_at', -1)]),
+        IndexModel([('performed_at', 1)]),
+        IndexModel(
+            [('title', 'text'), ('description', 'text'), ('notes', 'text')],
+            weights={'title': 10, 'description': 5, 'notes': 1},
+            default_language=TEXT_LANGUAGE,
+            name='maintenance_history_text'
+        )
+    ]
+    
     def __init__(self, db):
-        self.collection = db['maintenance_history']
+        self.collection = db[self.COLLECTION]
+        self.rollups = MaintenanceRollup(db)
     
-    def create_history(self, data):
-        """Buat record history baru"""
-        history = {
-            'machine_id': data['machine_id'],
+    def build_history(self, data):
+        """Susun dokumen history dari data input, raise ValueError jika tidak valid"""
+        return {
+            'machine_id': parse_key(data, 'machine_id'),
             'component_id': data.get('component_id', None),
             'work_order_id': data.get('work_order_id', None),
-            'maintenance_type': data['maintenance_type'],  # preventive, corrective, predictive, emergency
+            'maintenance_type': parse_key(data, 'maintenance_type'),  # preventive, corrective, predictive, emergency
             'title': data['title'],
             'description': data['description'],
             'performed_by': data['performed_by'],
-            'performed_at': data.get('performed_at', datetime.utcnow()),
-            'duration_hours': data.get('duration_hours', 0),
+            'performed_at': parse_performed_at(data.get('performed_at')),
+            'duration_hours': parse_amount(data, 'duration_hours'),
             'parts_used': data.get('parts_used', []),
-            'cost': data.get('cost', 0),
-            'outcome': data.get('outcome', 'success'),  # success, partial, failed
+            'cost': parse_amount(data, 'cost'),
+            'outcome': parse_outcome(data.get('outcome', 'success')),  # success, partial, failed
             'notes': data.get('notes', ''),
             'attachments': data.get('attachments', []),
             'created_at': datetime.utcnow()
         }
+    
+    def create_history(self, data):
+        """Buat record history baru (divalidasi sebelum insert)"""
+        history = self.build_history(data)
         result = self.collection.insert_one(history)
+        self.rollups.record(history)
         return str(result.inserted_id)
     
+    def bulk_create_history(self, rows, batch_size=None):
+        """Import banyak record history sekaligus, mengembalikan laporan per baris"""
+        # build_history validates every field the rollup reads, so a bad row
+        # is reported before anything is written
+        return import_rows(self.collection, rows, self.build_history, batch_size, self.rollups.record_many)
+    
+    def search(self, q, filters=None, skip=0, limit=20):
+        """Cari history di title, description dan notes, mengembalikan (hasil, has_more)"""
+        return text_search(read_collection(self.collection), q, filters, {'attachments': 0}, skip, limit)
+    
     def get_history_by_machine(self, machine_id, limit=50):
         """Ambil history berdasarkan mesin"""
-        history = list(self.collection.find({
+        history = list(read_collection(self.collection).find({
             'machine_id': machine_id
         }).sort('performed_at', -1).limit(limit))
         
-        for h in history:
-            h['_id'] = str(h['_id'])
         return history
     
+    def iter_history_by_machine(self, machine_id, limit=0):
+        """Cursor history mesin untuk export streaming (limit 0 = semua)"""
+        return read_collection(self.collection).find({
+            'machine_id': machine_id
+        }).sort('performed_at', -1).limit(limit).batch_size(STREAM_BATCH_SIZE)
+    
     def get_history_by_component(self, component_id, limit=50):
         """Ambil history berdasarkan komponen"""
-        history = list(self.collection.find({
+        history = list(read_collection(self.collection).find({
             'component_id': component_id
         }).sort('performed_at', -1).limit(limit))
         
-        for h in history:
-            h['_id'] = str(h['_id'])
         return history
\ No newline at end of file
@@ -0,0 +1,151 @@
+from datetime import datetime
+from dateutil import parser as date_parser
+from pymongo import IndexModel, UpdateOne
+
+OUTCOMES = ['success', 'partial', 'failed']
+
+GROUP_KEYS = {
+    'type': '$maintenance_type',
+    'machine': '$machine_id',
+    'day': '$day',
+    'week': {'$dateTrunc': {'date': '$day', 'unit': 'week', 'startOfWeek': 'monday'}},
+    'month': {'$dateTrunc': {'date': '$day', 'unit': 'month'}}
+}
+
+class MaintenanceRollup:
+    """Model untuk rollup harian maintenance per mesin dan tipe"""
+    
+    COLLECTION = 'maintenance_rollups'
+    INDEXES = [
+        IndexModel([('day', 1), ('machine_id', 1), ('maintenance_type', 1)], unique=True),
+        IndexModel([('machine_id', 1), ('day', 1)])
+    ]
+    
+    def __init__(self, db):
+        self.collection = db[self.COLLECTION]
+        self.history = db['maintenance_history']
+    
+    def to_day(self, value):
+        """Potong waktu ke awal hari (UTC)"""
+        if isinstance(value, str):
+            value = date_parser.isoparse(value)
+        if not isinstance(value, datetime):
+            raise ValueError('performed_at must be a date')
+        return datetime(value.year, value.month, value.day)
+    
+    def record(self, history):
+        """Tambahkan satu record history ke rollup harian"""
+        self.record_many([history])
+    
+    def record_many(self, histories):
+        """Tambahkan banyak record history, satu upsert per hari/mesin/tipe"""
+        totals = {}
+        for history in histories:
+            key = (
+                self.to_day(history['performed_at']),
+                history['machine_id'],
+                history['maintenance_type']
+            )
+            inc = totals.setdefault(key, {'count': 0, 'total_cost': 0, 'total_hours': 0})
+            inc['count'] += 1
+            inc['total_cost'] += history.get('cost', 0)
+            inc['total_hours'] += history.get('duration_hours', 0)
+            outcome = 'outcomes.' + history.get('outcome', 'success')
+            inc[outcome] = inc.get(outcome, 0) + 1
+        
+        now = datetime.utcnow()
+        operations = [
+            UpdateOne(
+                {'day': day, 'machine_id': machine_id, 'maintenance_type': maintenance_type},
+                {'$inc': inc, '$set': {'updated_at': now}},
+                upsert=True
+            )
+            for (day, machine_id, maintenance_type), inc in totals.items()
+        ]
+        if operations:
+            self.collection.bulk_write(operations, ordered=False)
+    
+    def build_summary_pipeline(self, start=None, end=None, group_by=None, machine_id=None):
+        """Pipeline ringkasan dari rollup untuk rentang tanggal [start, end)"""
+        group_by = group_by or ['type']
+        for key in group_by:
+            if key not in GROUP_KEYS:
+                raise ValueError('group_by must be any of: ' + ', '.join(GROUP_KEYS))
+        
+        match = {}
+        if start or end:
+            match['day'] = {}
+            if start:
+                match['day']['$gte'] = self.to_day(start)
+            if end:
+                match['day']['$lt'] = self.to_day(end)
+        if machine_id:
+            match['machine_id'] = machine_id
+        
+        if len(group_by) == 1:
+            group_id = GROUP_KEYS[group_by[0]]
+        else:
+            group_id = {key: GROUP_KEYS[key] for key in group_by}
+        
+        group = {
+            '_id': group_id,
+            'count': {'$sum': '$count'},
+            'total_cost': {'$sum': '$total_cost'},
+            'total_hours': {'$sum': '$total_hours'}
+        }
+        for outcome in OUTCOMES:
+            group[outcome] = {'$sum': {'$ifNull': ['$outcomes.' + outcome, 0]}}
+        
+        return [
+            {'$match': match},
+            {'$group': group},
+            {'$set': {'outcomes': {outcome: '$' + outcome for outcome in OUTCOMES}}},
+            {'$unset': OUTCOMES},
+            {'$sort': {'_id': 1}}
+        ]
+    
+    def rebuild(self, start=None):
+        """Bangun ulang rollup dari maintenance_history"""
+        match = {}
+        if start:
+            start = self.to_day(start)
+            match['performed_at'] = {'$gte': start}
+            self.collection.delete_many({'day': {'$gte': start}})
+        else:
+            self.collection.delete_many({})
+        
+        group = {
+            '_id': {
+                'day': {'$dateTrunc': {'date': {'$toDate': '$performed_at'}, 'unit': 'day'}},
+                'machine_id': '$machine_id',
+                'maintenance_type': '$maintenance_type'
+            },
+            'count': {'$sum': 1},
+            'total_cost': {'$sum': '$cost'},
+            'total_hours': {'$sum': '$duration_hours'}
+        }
+        for outcome in OUTCOMES:
+            group[outcome] = {'$sum': {'$cond': [{'$eq': ['$outcome', outcome]}, 1, 0]}}
+        
+        self.history.aggregate([
+            {'$match': match},
+            {'$group': group},
+            {'$project': {
+                '_id': 0,
+                'day': '$_id.day',
+                'machine_id': '$_id.machine_id',
+                'maintenance_type': '$_id.maintenance_type',
+                'count': 1,
+                'total_cost': 1,
+                'total_hours': 1,
+                'outcomes': {outcome: '$' + outcome for outcome in OUTCOMES},
+                'updated_at': '$$NOW'
+            }},
+            {'$merge': {
+                'into': self.collection.name,
+                'on': ['day', 'machine_id', 'maintenance_type'],
+                'whenMatched': 'replace',
+                'whenNotMatched': 'insert'
+            }}
+        ], allowDiskUse=True)
+        return self.collection.count_documents({})
@@ -1,11 +1,23 @@
 from datetime import datetime
 from bson import ObjectId
+from pymongo import IndexModel
+from pagination import paginate, parse_fields
+from models.dashboard_stats import DashboardStats
+
+OVERDUE_PROJECTION = {'machine_id': 1, 'component_id': 1, 'title': 1, 'assigned_to': 1, 'next_scheduled': 1}
 
 class MaintenanceSchedule:
     """Model untuk Maintenance Scheduling"""
     
+    COLLECTION = 'maintenance_schedules'
+    INDEXES = [
+        IndexModel([('machine_id', 1)]),
+        IndexModel([('status', 1), ('next_scheduled', 1), ('_id', 1)])
+    ]
+    
     def __init__(self, db):
-        self.collection = db['maintenance_schedules']
+        self.collection = db[self.COLLECTION]
+        self.stats = DashboardStats(db)
     
     def create_schedule(self, data):
         """Buat jadwal maintenance baru"""
@@ -28,21 +40,52 @@ class MaintenanceSchedule:
             'updated_at': datetime.utcnow()
         }
         result = self.collection.insert_one(schedule)
+        self.stats.invalidate()
         return str(result.inserted_id)
     
-    def get_upcoming_schedules(self, days=30):
-        """Ambil jadwal maintenance yang akan datang"""
+    def get_upcoming_schedules(self, days=30, limit=None, after=None, fields=None):
+        """Ambil jadwal maintenance yang akan datang, mengembalikan (schedules, next_cursor)"""
         from datetime import timedelta
         end_date = datetime.utcnow() + timedelta(days=days)
         
-        schedules = list(self.collection.find({
+        query = {
             'next_scheduled': {'$lte': end_date},
             'status': {'$in': ['scheduled', 'overdue']}
-        }).sort('next_scheduled', 1))
+        }
+        projection = parse_fields(fields, 'next_scheduled')
+        return paginate(self.collection, query, 'next_scheduled', 1, limit, after, projection)
+    
+    def get_overdue_schedules(self, limit=None, after=None, fields=None):
+        """Ambil jadwal berstatus overdue, mengembalikan (schedules, next_cursor)"""
+        projection = parse_fields(fields, 'next_scheduled')
+        return paginate(self.collection, {'status': 'overdue'}, 'next_scheduled', 1, limit, after, projection)
+    
+    def mark_overdue(self, now=None, batch_size=1000):
+        """Ubah satu batch jadwal yang lewat tanggal menjadi overdue
+
+        Mengembalikan jadwal yang baru saja ditandai overdue; panggil ulang
+        sampai hasilnya lebih sedikit dari batch_size.
+        """
+        now = now or datetime.utcnow()
+        query = {'status': 'scheduled', 'next_scheduled': {'$lt': now}}
+        overdue = list(
+            self.collection.find(query, OVERDUE_PROJECTION).sort('next_scheduled', 1).limit(batch_size)
+        )
+        if not overdue:
+            return []
         
-        for schedule in schedules:
-            schedule['_id'] = str(schedule['_id'])
-        return schedules
+        ids = [schedule['_id'] for schedule in overdue]
+        result = self.collection.update_many(
+            {'_id': {'$in': ids}, 'status': 'scheduled'},
+            {'$set': {'status': 'overdue', 'overdue_since': now, 'updated_at': now}}
+        )
+        if result.modified_count < len(ids):
+            # Some were completed in between; report only what was flipped
+            flipped = {s['_id'] for s in self.collection.find({'_id': {'$in': ids}, 'overdue_since': now}, {'_id': 1})}
+            overdue = [schedule for schedule in overdue if schedule['_id'] in flipped]
+        if overdue:
+            self.stats.invalidate()
+        return overdue
     
     def mark_completed(self, schedule_id):
         """Tandai schedule sebagai selesai"""
@@ -75,4 +118,8 @@ class MaintenanceSchedule:
             {'_id': ObjectId(schedule_id)},
             {'$set': update_data}
         )
-        return result.modified_count > 0
\ No newline at end of file
+        if result.modified_count == 0:
+            return False
+        
+        self.stats.invalidate()
+        return True
\ No newline at end of file
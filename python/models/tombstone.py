@@ -0,0 +1,27 @@
+from datetime import datetime
+import os
+from pymongo import IndexModel
+
+# Deletes older than this are forgotten; sync tokens older than it must resync
+RETENTION_SECONDS = int(os.getenv('TOMBSTONE_RETENTION_SECONDS', str(30 * 24 * 3600)))
+
+class Tombstone:
+    """Model untuk catatan penghapusan, dipakai feed sync"""
+    
+    COLLECTION = 'tombstones'
+    INDEXES = [
+        IndexModel([('deleted_at', 1)], expireAfterSeconds=RETENTION_SECONDS),
+        IndexModel([('deleted_at', 1), ('_id', 1)]),
+        IndexModel([('collection', 1), ('deleted_at', 1), ('_id', 1)])
+    ]
+    
+    def __init__(self, db):
+        self.collection = db[self.COLLECTION]
+    
+    def record(self, collection_name, entity_id):
+        """Catat bahwa dokumen entity_id di collection_name dihapus"""
+        self.collection.insert_one({
+            'collection': collection_name,
+            'entity_id': str(entity_id),
+            'deleted_at': datetime.utcnow()
+        })
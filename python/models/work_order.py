@@ -1,11 +1,58 @@
 from datetime import datetime
 from bson import ObjectId
+from pymongo import IndexModel, ReturnDocument
+from models.dashboard_stats import ACTIVE_WORK_ORDER_STATUSES, DashboardStats
+from models.tombstone import Tombstone
+from models.collection_version import CollectionVersion
+from models.event_log import EventLog
+from pagination import paginate, parse_fields
+from streaming import STREAM_BATCH_SIZE
+from database import read_collection
+from entity_cache import NOT_PROBED, cached_by_id, entity_cache, version_by_id
+from text_search import TEXT_LANGUAGE, text_search
+
+# Embedded arrays are trimmed on list endpoints to keep responses bounded
+LIST_PROJECTION = {'notes': {'$slice': -20}}
 
 class WorkOrder:
     """Model untuk Work Orders"""
     
+    COLLECTION = 'work_orders'
+    INDEXES = [
+        IndexModel([('order_number', 1)], unique=True),
+        IndexModel([('created_at', -1), ('_id', -1)]),
+        IndexModel([('status', 1), ('priority', 1), ('machine_id', 1), ('created_at', -1), ('_id', -1)]),
+        IndexModel([('status', 1), ('created_at', -1), ('_id', -1)]),
+        IndexModel([('machine_id', 1), ('created_at', -1), ('_id', -1)]),
+        IndexModel([('updated_at', 1), ('_id', 1)]),
+        IndexModel(
+            [('title', 'text'), ('description', 'text'), ('notes.content', 'text')],
+            weights={'title': 10, 'description': 5, 'notes.content': 1},
+            default_language=TEXT_LANGUAGE,
+            name='work_orders_text'
+        )
+    ]
+    
     def __init__(self, db):
-        self.collection = db['work_orders']
+        self.collection = db[self.COLLECTION]
+        self.stats = DashboardStats(db)
+        self.tombstones = Tombstone(db)
+        self.versions = CollectionVersion(db)
+        self.events = EventLog(db)
+    
+    def _track_active(self, previous_status, new_status):
+        """Sesuaikan counter work order aktif di ringkasan dashboard"""
+        delta = (new_status in ACTIVE_WORK_ORDER_STATUSES) - (previous_status in ACTIVE_WORK_ORDER_STATUSES)
+        self.stats.increment('active_work_orders', delta)
+    
+    def _record_transition(self, work_order_id, previous_status, new_status):
+        """Catat event perubahan status work order"""
+        if previous_status != new_status:
+            self.events.record('work_order.status', {
+                'work_order_id': work_order_id,
+                'previous_status': previous_status,
+                'status': new_status
+            })
     
     def create_work_order(self, data):
         """Buat work order baru"""
@@ -29,41 +76,61 @@ class WorkOrder:
             'updated_at': datetime.utcnow()
         }
         result = self.collection.insert_one(work_order)
+        self.versions.bump(self.COLLECTION)
+        self._track_active(None, work_order['status'])
         return str(result.inserted_id)
     
-    def get_all_work_orders(self, filters=None):
-        """Ambil semua work orders dengan filter"""
+    def get_all_work_orders(self, filters=None, limit=None, after=None, fields=None):
+        """Ambil work orders dengan filter, mengembalikan (work_orders, next_cursor)"""
         query = filters if filters else {}
-        work_orders = list(self.collection.find(query).sort('created_at', -1))
-        for wo in work_orders:
-            wo['_id'] = str(wo['_id'])
-        return work_orders
+        projection = parse_fields(fields, 'created_at') or LIST_PROJECTION
+        return paginate(self.collection, query, 'created_at', -1, limit, after, projection)
     
-    def get_work_order_by_id(self, work_order_id):
+    def iter_work_orders(self, filters=None, fields=None):
+        """Cursor semua work orders untuk export streaming"""
+        query = filters if filters else {}
+        projection = parse_fields(fields, 'created_at')
+        return read_collection(self.collection).find(query, projection).sort('created_at', -1).batch_size(STREAM_BATCH_SIZE)
+    
+    def search(self, q, filters=None, skip=0, limit=20):
+        """Cari work order di title, description dan notes, mengembalikan (hasil, has_more)"""
+        return text_search(self.collection, q, filters, LIST_PROJECTION, skip, limit)
+    
+    def get_work_order_by_id(self, work_order_id, expected_version=NOT_PROBED):
         """Ambil work order berdasarkan ID"""
-        work_order = self.collection.find_one({'_id': ObjectId(work_order_id)})
-        if work_order:
-            work_order['_id'] = str(work_order['_id'])
-        return work_order
+        return cached_by_id(self.collection, work_order_id, expected_version)
+    
+    def get_work_order_version(self, work_order_id):
+        """Versi work order untuk ETag, mengembalikan (ada, updated_at)"""
+        return version_by_id(self.collection, work_order_id)
     
     def update_status(self, work_order_id, status):
         """Update status work order"""
+        now = datetime.utcnow()
         update_data = {
-            'status': status,
-            'updated_at': datetime.utcnow()
+            'status': {'$literal': status},
+            'updated_at': now
         }
         
-        current = self.get_work_order_by_id(work_order_id) or {}
-        if status == 'in_progress' and not current.get('started_at'):
-            update_data['started_at'] = datetime.utcnow()
+        if status == 'in_progress':
+            update_data['started_at'] = {'$ifNull': ['$started_at', now]}
         elif status == 'completed':
-            update_data['completed_at'] = datetime.utcnow()
+            update_data['completed_at'] = now
         
-        result = self.collection.update_one(
+        previous = self.collection.find_one_and_update(
             {'_id': ObjectId(work_order_id)},
-            {'$set': update_data}
+            [{'$set': update_data}],
+            projection={'status': 1},
+            return_document=ReturnDocument.BEFORE
         )
-        return result.modified_count > 0
+        entity_cache.invalidate(self.COLLECTION, work_order_id)
+        if not previous:
+            return False
+        
+        self.versions.bump(self.COLLECTION)
+        self._track_active(previous.get('status'), status)
+        self._record_transition(work_order_id, previous.get('status'), status)
+        return True
     
     def add_note(self, work_order_id, note, author):
         """Tambah catatan ke work order"""
@@ -80,6 +147,9 @@ class WorkOrder:
                 '$set': {'updated_at': datetime.utcnow()}
             }
         )
+        entity_cache.invalidate(self.COLLECTION, work_order_id)
+        if result.modified_count:
+            self.versions.bump(self.COLLECTION)
         return result.modified_count > 0
 
     def update_work_order(self, work_order_id, data):
@@ -90,13 +160,33 @@ class WorkOrder:
             data.pop('_id')
         if 'created_at' in data:
             data.pop('created_at')
-        result = self.collection.update_one(
+        previous = self.collection.find_one_and_update(
             {'_id': ObjectId(work_order_id)},
-            {'$set': data}
+            {'$set': data},
+            projection={'status': 1},
+            return_document=ReturnDocument.BEFORE
         )
-        return result.modified_count > 0
+        entity_cache.invalidate(self.COLLECTION, work_order_id)
+        if not previous:
+            return False
+        
+        self.versions.bump(self.COLLECTION)
+        if 'status' in data:
+            self._track_active(previous.get('status'), data['status'])
+            self._record_transition(work_order_id, previous.get('status'), data['status'])
+        return True
 
     def delete_work_order(self, work_order_id):
         """Hapus work order"""
-        result = self.collection.delete_one({'_id': ObjectId(work_order_id)})
-        return result.deleted_count > 0
\ No newline at end of file
+        deleted = self.collection.find_one_and_delete(
+            {'_id': ObjectId(work_order_id)},
+            projection={'status': 1}
+        )
+        entity_cache.invalidate(self.COLLECTION, work_order_id)
+        if not deleted:
+            return False
+        
+        self.tombstones.record(self.COLLECTION, work_order_id)
+        self.versions.bump(self.COLLECTION)
+        self._track_active(deleted.get('status'), None)
+        return True
\ No newline at end of file
@@ -0,0 +1,97 @@
+import base64
+from bson import json_util
+from database import read_collection
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 500
+
+
+def parse_limit(limit):
+    """Clamp limit ke rentang yang diizinkan"""
+    if limit is None or limit <= 0:
+        return DEFAULT_LIMIT
+    return min(limit, MAX_LIMIT)
+
+
+def parse_fields(fields, sort_key='_id'):
+    """Ubah parameter fields=a,b,c menjadi projection MongoDB"""
+    if not fields:
+        return None
+    if isinstance(fields, str):
+        fields = fields.split(',')
+    projection = {field.strip(): 1 for field in fields if field.strip()}
+    if not projection:
+        return None
+    # The sort key is needed to build the next cursor
+    projection[sort_key] = 1
+    return projection
+
+
+def encode_cursor(doc, sort_key='_id'):
+    """Buat token cursor dari dokumen terakhir pada halaman"""
+    values = [doc['_id']] if sort_key == '_id' else [doc.get(sort_key), doc['_id']]
+    raw = json_util.dumps(values).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Baca token cursor, ValueError jika tidak valid"""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        values = json_util.loads(raw)
+    except Exception:
+        raise ValueError('Invalid pagination cursor')
+    if not isinstance(values, list) or len(values) not in (1, 2):
+        raise ValueError('Invalid pagination cursor')
+    return values
+
+
+def keyset_filter(token, sort_key='_id', direction=1):
+    """Filter untuk dokumen setelah posisi cursor"""
+    op = '$gt' if direction == 1 else '$lt'
+    values = decode_cursor(token)
+    if sort_key == '_id':
+        return {'_id': {op: values[-1]}}
+
+    value, last_id = values if len(values) == 2 else (None, values[0])
+    return {'$or': [
+        {sort_key: {op: value}},
+        {sort_key: value, '_id': {op: last_id}}
+    ]}
+
+
+def page_query(query=None, sort_key='_id', direction=1, limit=None, after=None):
+    """Susun (query, sort, limit) untuk satu halaman keyset pagination
+
+    limit yang dikembalikan sudah ditambah satu untuk mendeteksi halaman
+    berikutnya; hasilnya dipotong dengan split_page.
+    """
+    query = query or {}
+    limit = parse_limit(limit)
+    if after:
+        query = {'$and': [query, keyset_filter(after, sort_key, direction)]}
+
+    sort = [('_id', direction)] if sort_key == '_id' else [(sort_key, direction), ('_id', direction)]
+    return query, sort, limit + 1
+
+
+def split_page(documents, limit=None, sort_key='_id'):
+    """Potong hasil ke limit, mengembalikan (documents, next_cursor)"""
+    limit = parse_limit(limit)
+    next_cursor = None
+    if len(documents) > limit:
+        documents = documents[:limit]
+        next_cursor = encode_cursor(documents[-1], sort_key)
+    return documents, next_cursor
+
+
+def paginate(collection, query=None, sort_key='_id', direction=1, limit=None,
+             after=None, projection=None):
+    """Ambil satu halaman hasil dengan keyset pagination
+
+    Mengembalikan tuple (documents, next_cursor). next_cursor bernilai None
+    jika tidak ada halaman berikutnya.
+    """
+    query, sort, fetch = page_query(query, sort_key, direction, limit, after)
+    cursor = read_collection(collection).find(query, projection).sort(sort).limit(fetch)
+    return split_page(list(cursor), limit, sort_key)
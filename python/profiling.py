@@ -0,0 +1,137 @@
+from contextvars import ContextVar
+import os
+import time
+import bson
+from flask import g, request
+from pymongo import monitoring
+from metrics import COUNT_BUCKETS, Counter, Histogram
+
+SLOW_REQUEST_MS = float(os.getenv('SLOW_REQUEST_MS', '500'))
+# Measuring reply size re-encodes every reply, so it is opt-in
+PROFILE_REPLY_BYTES = os.getenv('QUERY_PROFILE_REPLY_BYTES', '').lower() in ('1', 'true', 'yes')
+
+_current_profile = ContextVar('query_profile', default=None)
+
+db_commands = Histogram(
+    'cmms_db_commands_per_request', 'MongoDB commands issued per request',
+    ('endpoint',), COUNT_BUCKETS
+)
+db_time = Histogram(
+    'cmms_db_time_seconds', 'Time spent in MongoDB commands per request', ('endpoint',)
+)
+db_documents = Counter(
+    'cmms_db_documents_returned_total', 'Documents returned by MongoDB', ('endpoint',)
+)
+db_reply_bytes = Counter(
+    'cmms_db_reply_bytes_total', 'Bytes of MongoDB replies (QUERY_PROFILE_REPLY_BYTES=1)', ('endpoint',)
+)
+
+
+class RequestProfile:
+    """Catatan command MongoDB selama satu request"""
+
+    __slots__ = ('commands', 'db_time', 'documents', 'reply_bytes', 'pending', 'started')
+
+    def __init__(self):
+        self.commands = []
+        self.db_time = 0.0
+        self.documents = 0
+        self.reply_bytes = 0
+        self.pending = {}
+        self.started = time.perf_counter()
+
+
+def _returned_documents(reply):
+    cursor = reply.get('cursor')
+    if cursor:
+        return len(cursor.get('firstBatch', cursor.get('nextBatch', ())))
+    if 'value' in reply:
+        return 1 if reply['value'] else 0
+    return 0
+
+
+class QueryProfiler(monitoring.CommandListener):
+    """CommandListener yang mencatat command ke profile request aktif"""
+
+    def started(self, event):
+        profile = _current_profile.get()
+        if profile is not None:
+            target = event.command.get(event.command_name)
+            profile.pending[(event.request_id, event.connection_id)] = target if isinstance(target, str) else None
+
+    def _finish(self, event, reply=None, failure=None):
+        profile = _current_profile.get()
+        if profile is None:
+            return
+        target = profile.pending.pop((event.request_id, event.connection_id), None)
+        duration = event.duration_micros / 1e6
+        documents = _returned_documents(reply) if reply else 0
+        profile.db_time += duration
+        profile.documents += documents
+        if PROFILE_REPLY_BYTES and reply:
+            profile.reply_bytes += len(bson.encode(reply))
+        profile.commands.append({
+            'command': event.command_name,
+            'collection': target,
+            'duration_ms': round(duration * 1000, 3),
+            'documents': documents,
+            'failure': failure
+        })
+
+    def succeeded(self, event):
+        self._finish(event, reply=event.reply)
+
+    def failed(self, event):
+        self._finish(event, failure=str(event.failure))
+
+
+query_profiler = QueryProfiler()
+
+
+def current_profile():
+    """Profile request yang sedang berjalan, atau None"""
+    return _current_profile.get()
+
+
+def init_profiling(app):
+    """Pasang profiling per request: header Server-Timing, metric dan log slow request"""
+
+    @app.before_request
+    def start_profile():
+        profile = RequestProfile()
+        g.query_profile = profile
+        _current_profile.set(profile)
+
+    @app.after_request
+    def finish_profile(response):
+        profile = g.get('query_profile')
+        if profile is None:
+            return response
+
+        endpoint = request.endpoint or 'unknown'
+        elapsed = time.perf_counter() - profile.started
+        db_commands.observe((endpoint,), len(profile.commands))
+        db_time.observe((endpoint,), profile.db_time)
+        db_documents.inc((endpoint,), profile.documents)
+        if PROFILE_REPLY_BYTES:
+            db_reply_bytes.inc((endpoint,), profile.reply_bytes)
+
+        response.headers.add(
+            'Server-Timing',
+            'db;dur=%.3f;desc="%d commands, %d docs"' % (
+                profile.db_time * 1000, len(profile.commands), profile.documents
+            )
+        )
+        response.headers.add('Server-Timing', 'app;dur=%.3f' % (elapsed * 1000))
+
+        if elapsed * 1000 >= SLOW_REQUEST_MS:
+            app.logger.warning(
+                'Slow request %s %s: %.1f ms total, %.1f ms in %d MongoDB commands: %s',
+                request.method, request.path, elapsed * 1000, profile.db_time * 1000,
+                len(profile.commands), profile.commands
+            )
+        return response
+
+    @app.teardown_request
+    def reset_profile(e=None):
+        _current_profile.set(None)
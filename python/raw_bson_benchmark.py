@@ -0,0 +1,97 @@
+"""Benchmark read path RawBSONDocument: alokasi dan CPU per 10k dokumen
+
+Mengisi database terpisah (default hyundai_cmms_bench) dengan work order
+sintetis lalu membaca dan menserialisasi koleksi dua kali, dengan codec
+default (dict) dan dengan RAW_CODEC_OPTIONS seperti MONGODB_RAW_BSON_READS=1:
+
+- page: list(cursor) lalu satu dumps_bytes, seperti endpoint list
+- stream: dumps_bytes per dokumen, seperti export streaming
+
+Untuk setiap kombinasi dicetak peak memori tracemalloc, CPU time dan wall
+time (timeit, terbaik dari --repeat), dinormalisasi per 10k dokumen.
+
+Contoh:
+    python raw_bson_benchmark.py --documents 10000,50000 --repeat 5
+"""
+import argparse
+import os
+import time
+import timeit
+import tracemalloc
+from pymongo import MongoClient
+from database import RAW_CODEC_OPTIONS
+from json_benchmark import make_work_orders
+from json_provider import dumps_bytes
+from models.work_order import LIST_PROJECTION
+
+
+def read_page(collection):
+    return dumps_bytes({'success': True, 'data': list(collection.find({}, LIST_PROJECTION))})
+
+
+def read_stream(collection):
+    total = 0
+    for doc in collection.find({}, LIST_PROJECTION).batch_size(500):
+        total += len(dumps_bytes(doc))
+    return total
+
+
+def seed(db, documents):
+    db['work_orders'].drop()
+    for start in range(0, documents, 10000):
+        db['work_orders'].insert_many(make_work_orders(min(10000, documents - start)), ordered=False)
+
+
+def peak_memory(fn):
+    """Peak bytes yang dialokasikan Python selama fn berjalan"""
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def cpu_time(fn, repeat):
+    """CPU time dan wall time terbaik dari repeat kali"""
+    cpu = []
+    wall = []
+    for _ in range(repeat):
+        started = time.process_time()
+        wall.append(timeit.timeit(fn, number=1))
+        cpu.append(time.process_time() - started)
+    return min(cpu), min(wall)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--documents', default='10000,50000', help='Comma separated collection sizes')
+    parser.add_argument('--database', default='hyundai_cmms_bench')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    if args.database == os.getenv('MONGODB_DB', 'hyundai_cmms'):
+        parser.error('refusing to seed the application database')
+
+    client = MongoClient(os.getenv('MONGODB_URI', 'mongodb://mongodb:27017/'))
+    db = client[args.database]
+    for documents in (int(size) for size in args.documents.split(',')):
+        seed(db, documents)
+        per_10k = 10000 / documents
+        for raw in (False, True):
+            collection = db['work_orders']
+            if raw:
+                collection = collection.with_options(codec_options=RAW_CODEC_OPTIONS)
+            for name, fn in (('page', read_page), ('stream', read_stream)):
+                peak = peak_memory(lambda: fn(collection))
+                cpu, wall = cpu_time(lambda: fn(collection), args.repeat)
+                print(
+                    f'documents={documents:6d} raw_bson={"on " if raw else "off"} {name:6s} '
+                    f'peak={peak * per_10k / 1048576:7.1f}MiB '
+                    f'cpu={cpu * per_10k * 1000:7.1f}ms wall={wall * per_10k * 1000:7.1f}ms  (per 10k docs)'
+                )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+import time
+from flask import g, request
+from database import pool_stats
+from metrics import Counter, Gauge, Histogram
+
+request_latency = Histogram(
+    'cmms_http_request_duration_seconds', 'HTTP request latency',
+    ('blueprint', 'endpoint', 'method')
+)
+requests_in_flight = Gauge('cmms_http_requests_in_flight', 'HTTP requests currently being served')
+request_errors = Counter(
+    'cmms_http_request_errors_total', 'HTTP responses with status >= 400',
+    ('blueprint', 'endpoint', 'status')
+)
+
+
+def _pool_stat(field):
+    return lambda: [((), pool_stats.snapshot()[field])]
+
+
+for _field, _documentation in (
+    ('checked_out', 'Connections currently checked out of the MongoDB pool'),
+    ('waiters', 'Threads waiting for a MongoDB pool connection'),
+    ('connections_open', 'Open MongoDB pool connections'),
+    ('wait_time_avg_ms', 'Average MongoDB pool checkout wait in milliseconds'),
+    ('wait_time_max_ms', 'Maximum MongoDB pool checkout wait in milliseconds')
+):
+    Gauge('cmms_mongo_pool_' + _field, _documentation, callback=_pool_stat(_field))
+
+for _field, _documentation in (
+    ('checkouts', 'MongoDB pool checkouts'),
+    ('checkout_failures', 'Failed MongoDB pool checkouts')
+):
+    Counter('cmms_mongo_pool_' + _field + '_total', _documentation, callback=_pool_stat(_field))
+
+
+def init_request_metrics(app):
+    """Pasang metric latency, in-flight dan error per route"""
+
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+        requests_in_flight.inc()
+
+    @app.after_request
+    def record_request(response):
+        started = g.get('request_started')
+        if started is not None:
+            labels = (request.blueprint or '', request.endpoint or 'unknown')
+            request_latency.observe(labels + (request.method,), time.perf_counter() - started)
+            if response.status_code >= 400:
+                request_errors.inc(labels + (str(response.status_code),))
+        return response
+
+    @app.teardown_request
+    def finish_request(e=None):
+        if g.pop('request_started', None) is not None:
+            requests_in_flight.dec()
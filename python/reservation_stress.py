@@ -0,0 +1,130 @@
+"""Stress test reservasi parts: banyak thread memanggil reserve_parts bersamaan
+
+Mengisi database terpisah (default hyundai_cmms_bench) dengan sedikit item
+inventory berstok terbatas supaya reservasi saling berebut dan sebagian
+gagal, lalu memeriksa bahwa stock tetap konsisten:
+
+- quantity akhir = quantity awal - total reservasi yang berhasil
+- jumlah quantity_change di ledger = quantity akhir - quantity awal
+- tidak ada quantity negatif
+- tidak ada penanda reservasi pending yang tertinggal
+
+Contoh:
+    python reservation_stress.py --threads 32 --reservations 2000 --items 5
+"""
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import os
+import random
+import sys
+import threading
+import time
+from pymongo import MongoClient
+from models.inventory import PENDING_FIELD, Inventory
+from models.inventory_transaction import InventoryTransaction
+
+
+def seed(db, items, quantity):
+    db['inventory'].drop()
+    db['inventory_transactions'].drop()
+    db['inventory'].create_indexes(Inventory.INDEXES)
+    db['inventory_transactions'].create_indexes(InventoryTransaction.INDEXES)
+    inventory = Inventory(db)
+    return [inventory.create_item({
+        'part_number': f'STRESS-{i}',
+        'name': f'Part {i}',
+        'category': 'spare_parts',
+        'quantity': quantity,
+        'unit': 'pcs',
+        'min_stock': quantity // 4
+    }) for i in range(items)]
+
+
+def run(db, item_ids, threads, reservations, max_parts):
+    """Jalankan reservasi acak dari banyak thread, kembalikan total yang berhasil per item"""
+    inventory = Inventory(db)
+    taken = {item_id: 0 for item_id in item_ids}
+    outcome = {'reserved': 0, 'failed': 0, 'errors': 0}
+    lock = threading.Lock()
+
+    def reserve(n):
+        rng = random.Random(n)
+        parts = [
+            {'item_id': item_id, 'quantity': rng.randint(1, 5)}
+            for item_id in rng.sample(item_ids, rng.randint(1, min(max_parts, len(item_ids))))
+        ]
+        try:
+            reserved, failed = inventory.reserve_parts(f'stress-{n}', parts)
+        except Exception:
+            with lock:
+                outcome['errors'] += 1
+            return
+        with lock:
+            if failed:
+                outcome['failed'] += 1
+                return
+            outcome['reserved'] += 1
+            for entry in reserved:
+                taken[entry['item_id']] -= entry['quantity_change']
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(reserve, range(reservations)))
+    return taken, outcome
+
+
+def verify(db, item_ids, quantity, taken):
+    """Bandingkan stock akhir dengan reservasi yang berhasil dan ledger"""
+    problems = []
+    ledger = {
+        row['_id']: row['total']
+        for row in db['inventory_transactions'].aggregate([
+            {'$match': {'item_id': {'$in': item_ids}}},
+            {'$group': {'_id': '$item_id', 'total': {'$sum': '$quantity_change'}}}
+        ])
+    }
+    for item in db['inventory'].find({}, {'quantity': 1, PENDING_FIELD: 1}):
+        item_id = str(item['_id'])
+        if item.get(PENDING_FIELD):
+            problems.append(f'{item_id}: pending reservation markers left behind')
+        if item['quantity'] < 0:
+            problems.append(f'{item_id}: negative quantity {item["quantity"]}')
+        if item['quantity'] != quantity - taken[item_id]:
+            problems.append(f'{item_id}: quantity {item["quantity"]} != {quantity} - {taken[item_id]} reserved')
+        if ledger.get(item_id, 0) != item['quantity'] - quantity:
+            problems.append(f'{item_id}: ledger sum {ledger.get(item_id, 0)} != {item["quantity"] - quantity}')
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=32)
+    parser.add_argument('--reservations', type=int, default=2000)
+    parser.add_argument('--items', type=int, default=5)
+    parser.add_argument('--quantity', type=int, default=500, help='Initial stock per item')
+    parser.add_argument('--max-parts', type=int, default=3, help='Maximum lines per reservation')
+    parser.add_argument('--database', default='hyundai_cmms_bench')
+    args = parser.parse_args()
+
+    if args.database == os.getenv('MONGODB_DB', 'hyundai_cmms'):
+        parser.error('refusing to seed the application database')
+
+    client = MongoClient(os.getenv('MONGODB_URI', 'mongodb://mongodb:27017/'), maxPoolSize=args.threads)
+    db = client[args.database]
+    item_ids = seed(db, args.items, args.quantity)
+
+    started = time.perf_counter()
+    taken, outcome = run(db, item_ids, args.threads, args.reservations, args.max_parts)
+    elapsed = time.perf_counter() - started
+    print(f'reserved={outcome["reserved"]} failed={outcome["failed"]} errors={outcome["errors"]} '
+          f'elapsed={elapsed:.1f}s ({args.reservations / elapsed:.0f} reservations/s)')
+
+    problems = verify(db, item_ids, args.quantity, taken)
+    for problem in problems:
+        print(problem)
+    if problems or outcome['errors']:
+        sys.exit(1)
+    print('stock consistent')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,8 @@
 from flask import Blueprint, request, jsonify
 from models.component import Component
 from database import get_db
+from bulk_import import read_rows
+from conditional import collection_validators, conditional_response, make_etag
 
 component_bp = Blueprint('components', __name__, url_prefix='/api/components')
 
@@ -8,10 +10,21 @@ component_bp = Blueprint('components', __name__, url_prefix='/api/components')
 def get_components_by_machine(machine_id):
     """GET komponen berdasarkan mesin"""
     try:
+        limit = request.args.get('limit', type=int)
+        after = request.args.get('after')
+        fields = request.args.get('fields')
+        
         db = get_db()
         component_model = Component(db)
-        components = component_model.get_components_by_machine(machine_id)
-        return jsonify({'success': True, 'data': components}), 200
+        etag, last_modified = collection_validators(component_model.collection)
+        
+        def build():
+            components, next_cursor = component_model.get_components_by_machine(machine_id, limit, after, fields)
+            return jsonify({'success': True, 'data': components, 'next_cursor': next_cursor})
+        
+        return conditional_response(etag, last_modified, build)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -27,16 +40,36 @@ def create_component():
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@component_bp.route('/bulk', methods=['POST'])
+def bulk_create_components():
+    """POST import banyak komponen (JSON array, NDJSON atau CSV)"""
+    try:
+        batch_size = request.args.get('batch_size', type=int)
+        db = get_db()
+        component_model = Component(db)
+        rows = read_rows(numeric_fields=('lifespan_hours', 'current_hours'))
+        report = component_model.bulk_create_components(rows, batch_size)
+        return jsonify({'success': True, 'data': report}), 200
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @component_bp.route('/<component_id>', methods=['GET'])
 def get_component(component_id):
     """GET komponen berdasarkan ID"""
     try:
         db = get_db()
         component_model = Component(db)
-        component = component_model.get_component_by_id(component_id)
-        if component:
-            return jsonify({'success': True, 'data': component}), 200
-        return jsonify({'success': False, 'error': 'Component not found'}), 404
+        found, updated_at = component_model.get_component_version(component_id)
+        if not found:
+            return jsonify({'success': False, 'error': 'Component not found'}), 404
+        
+        def build():
+            # The probed version lets a cache hit skip the second probe
+            return jsonify({'success': True, 'data': component_model.get_component_by_id(component_id, updated_at)})
+        
+        return conditional_response(make_etag(component_id, updated_at), updated_at, build)
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -0,0 +1,21 @@
+from flask import Blueprint, jsonify
+from database import get_pool_stats
+from entity_cache import entity_cache
+
+diagnostic_bp = Blueprint('diagnostics', __name__, url_prefix='/api/diagnostics')
+
+@diagnostic_bp.route('/pool', methods=['GET'])
+def get_pool_diagnostics():
+    """GET statistik connection pool MongoDB worker ini"""
+    try:
+        return jsonify({'success': True, 'data': get_pool_stats()}), 200
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@diagnostic_bp.route('/cache', methods=['GET'])
+def get_cache_diagnostics():
+    """GET ukuran dan konfigurasi entity cache worker ini"""
+    try:
+        return jsonify({'success': True, 'data': entity_cache.snapshot()}), 200
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
\ No newline at end of file
@@ -0,0 +1,31 @@
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from database import get_db
+from events import start_tailer
+from sse import TooManyClients, open_stream, parse_last_event_id, parse_types
+
+event_bp = Blueprint('events', __name__, url_prefix='/api/events')
+
+@event_bp.route('/stream', methods=['GET'])
+def stream_events():
+    """GET stream server-sent events (status mesin, work order, alert)"""
+    try:
+        types = parse_types(request.args.get('types'))
+        last_event_id = parse_last_event_id(
+            request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+        )
+        
+        db = get_db()
+        if not start_tailer(db):
+            return jsonify({'success': False, 'error': 'Event log is not initialized'}), 503
+        stream = open_stream(db, types, last_event_id)
+        return Response(
+            stream_with_context(stream),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+    except TooManyClients as e:
+        return jsonify({'success': False, 'error': str(e)}), 503
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
@@ -1,6 +1,8 @@
 from flask import Blueprint, request, jsonify
 from models.maintenance_history import MaintenanceHistory
 from database import get_db
+from bulk_import import read_rows
+from streaming import get_stream_format, stream_cursor
 
 history_bp = Blueprint('history', __name__, url_prefix='/api/history')
 
@@ -13,6 +15,25 @@ def create_history():
         history_model = MaintenanceHistory(db)
         history_id = history_model.create_history(data)
         return jsonify({'success': True, 'history_id': history_id}), 201
+    except KeyError as e:
+        return jsonify({'success': False, 'error': f'missing field {e}'}), 400
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@history_bp.route('/bulk', methods=['POST'])
+def bulk_create_history():
+    """POST import banyak record history (JSON array, NDJSON atau CSV)"""
+    try:
+        batch_size = request.args.get('batch_size', type=int)
+        db = get_db()
+        history_model = MaintenanceHistory(db)
+        rows = read_rows(numeric_fields=('duration_hours', 'cost'))
+        report = history_model.bulk_create_history(rows, batch_size)
+        return jsonify({'success': True, 'data': report}), 200
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -20,11 +41,18 @@ def create_history():
 def get_history_by_machine(machine_id):
     """GET history berdasarkan mesin"""
     try:
-        limit = request.args.get('limit', default=50, type=int)
+        stream_format = get_stream_format()
         db = get_db()
         history_model = MaintenanceHistory(db)
+        if stream_format:
+            limit = request.args.get('limit', default=0, type=int)
+            return stream_cursor(history_model.iter_history_by_machine(machine_id, limit), stream_format)
+        
+        limit = request.args.get('limit', default=50, type=int)
         history = history_model.get_history_by_machine(machine_id, limit)
         return jsonify({'success': True, 'data': history}), 200
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
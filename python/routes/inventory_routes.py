@@ -1,5 +1,6 @@
 from flask import Blueprint, request, jsonify
 from models.inventory import Inventory
+from models.inventory_transaction import InventoryTransaction
 from database import get_db
 
 inventory_bp = Blueprint('inventory', __name__, url_prefix='/api/inventory')
@@ -16,6 +17,20 @@ def create_item():
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@inventory_bp.route('/<item_id>', methods=['PUT'])
+def update_item(item_id):
+    """PUT update item inventory"""
+    try:
+        data = request.get_json()
+        db = get_db()
+        inventory_model = Inventory(db)
+        success = inventory_model.update_item(item_id, data)
+        if success:
+            return jsonify({'success': True, 'message': 'Item updated'}), 200
+        return jsonify({'success': False, 'error': 'Item not found or no changes made'}), 404
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @inventory_bp.route('/<item_id>/quantity', methods=['PUT'])
 def update_quantity(item_id):
     """PUT update quantity item"""
@@ -27,11 +42,35 @@ def update_quantity(item_id):
         
         db = get_db()
         inventory_model = Inventory(db)
-        success = inventory_model.update_quantity(item_id, quantity_change, transaction_type, notes)
+        item = inventory_model.update_quantity(item_id, quantity_change, transaction_type, notes)
         
-        if success:
-            return jsonify({'success': True, 'message': 'Quantity updated'}), 200
+        if item:
+            return jsonify({'success': True, 'message': 'Quantity updated', 'data': item}), 200
         return jsonify({'success': False, 'error': 'Item not found or insufficient stock'}), 400
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@inventory_bp.route('/reserve', methods=['POST'])
+def reserve_parts():
+    """POST reservasi parts untuk satu work order"""
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'success': False, 'error': 'Expected a JSON object'}), 400
+        work_order_id = data.get('work_order_id')
+        parts = data.get('parts', [])
+        
+        db = get_db()
+        inventory_model = Inventory(db)
+        reserved, failed = inventory_model.reserve_parts(work_order_id, parts)
+        
+        if failed:
+            return jsonify({'success': False, 'error': 'Insufficient stock', 'failed_items': failed}), 409
+        return jsonify({'success': True, 'message': 'Parts reserved', 'data': reserved}), 200
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -43,5 +82,21 @@ def get_low_stock():
         inventory_model = Inventory(db)
         items = inventory_model.get_low_stock_items()
         return jsonify({'success': True, 'data': items}), 200
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@inventory_bp.route('/<item_id>/transactions', methods=['GET'])
+def get_transactions(item_id):
+    """GET ledger transaksi item per halaman"""
+    try:
+        limit = request.args.get('limit', type=int)
+        after = request.args.get('after')
+        
+        db = get_db()
+        transaction_model = InventoryTransaction(db)
+        transactions, next_cursor = transaction_model.get_ledger(item_id, limit, after)
+        return jsonify({'success': True, 'data': transactions, 'next_cursor': next_cursor}), 200
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
\ No newline at end of file
@@ -1,6 +1,8 @@
 from flask import Blueprint, request, jsonify
 from models.machine import Machine
 from database import get_db
+from bulk_import import read_rows
+from conditional import collection_validators, conditional_response, make_etag
 
 machine_bp = Blueprint('machines', __name__, url_prefix='/api/machines')
 
@@ -8,10 +10,21 @@ machine_bp = Blueprint('machines', __name__, url_prefix='/api/machines')
 def get_all_machines():
     """GET semua mesin"""
     try:
+        limit = request.args.get('limit', type=int)
+        after = request.args.get('after')
+        fields = request.args.get('fields')
+        
         db = get_db()
         machine_model = Machine(db)
-        machines = machine_model.get_all_machines()
-        return jsonify({'success': True, 'data': machines}), 200
+        etag, last_modified = collection_validators(machine_model.collection)
+        
+        def build():
+            machines, next_cursor = machine_model.get_all_machines(limit, after, fields)
+            return jsonify({'success': True, 'data': machines, 'next_cursor': next_cursor})
+        
+        return conditional_response(etag, last_modified, build)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -27,16 +40,35 @@ def create_machine():
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@machine_bp.route('/bulk', methods=['POST'])
+def bulk_create_machines():
+    """POST import banyak mesin (JSON array, NDJSON atau CSV)"""
+    try:
+        batch_size = request.args.get('batch_size', type=int)
+        db = get_db()
+        machine_model = Machine(db)
+        report = machine_model.bulk_create_machines(read_rows(), batch_size)
+        return jsonify({'success': True, 'data': report}), 200
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @machine_bp.route('/<machine_id>', methods=['GET'])
 def get_machine(machine_id):
     """GET mesin berdasarkan ID"""
     try:
         db = get_db()
         machine_model = Machine(db)
-        machine = machine_model.get_machine_by_id(machine_id)
-        if machine:
-            return jsonify({'success': True, 'data': machine}), 200
-        return jsonify({'success': False, 'error': 'Machine not found'}), 404
+        found, updated_at = machine_model.get_machine_version(machine_id)
+        if not found:
+            return jsonify({'success': False, 'error': 'Machine not found'}), 404
+        
+        def build():
+            # The probed version lets a cache hit skip the second probe
+            return jsonify({'success': True, 'data': machine_model.get_machine_by_id(machine_id, updated_at)})
+        
+        return conditional_response(make_etag(machine_id, updated_at), updated_at, build)
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -0,0 +1,9 @@
+from flask import Blueprint, Response
+from metrics import render
+
+metrics_bp = Blueprint('metrics', __name__)
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def get_metrics():
+    """GET metric dalam format teks Prometheus"""
+    return Response(render(), mimetype='text/plain; version=0.0.4')
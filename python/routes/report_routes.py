@@ -1,5 +1,8 @@
 from flask import Blueprint, request, jsonify
 from database import get_db
+from models.dashboard_stats import DashboardStats
+from models.maintenance_rollup import MaintenanceRollup
+from streaming import STREAM_BATCH_SIZE, get_stream_format, stream_cursor
 from datetime import datetime, timedelta
 
 report_bp = Blueprint('reports', __name__, url_prefix='/api/reports')
@@ -8,47 +11,12 @@ report_bp = Blueprint('reports', __name__, url_prefix='/api/reports')
 def get_dashboard_stats():
     """GET statistik dashboard"""
     try:
-        db = get_db()
-        
-        # Total machines
-        total_machines = db['machines'].count_documents({})
-        
-        # Active work orders
-        active_work_orders = db['work_orders'].count_documents({
-            'status': {'$in': ['pending', 'in_progress']}
-        })
-        
-        # Upcoming maintenance (next 7 days)
-        next_week = datetime.utcnow() + timedelta(days=7)
-        upcoming_maintenance = db['maintenance_schedules'].count_documents({
-            'next_scheduled': {'$lte': next_week},
-            'status': 'scheduled'
-        })
-        
-        # Low stock items
-        low_stock = db['inventory'].count_documents({
-            '$expr': {'$lte': ['$quantity', '$min_stock']}
-        })
-        
-        # Critical components
-        critical_components = db['components'].count_documents({
-            'condition': 'critical'
-        })
+        fresh = request.args.get('fresh', default=0, type=int)
+        max_age = request.args.get('max_age', type=int)
+        timeout = request.args.get('timeout', type=float)
         
-        # Overdue compliance
-        overdue_compliance = db['compliance'].count_documents({
-            'due_date': {'$lt': datetime.utcnow()},
-            'status': {'$in': ['pending', 'overdue']}
-        })
-        
-        stats = {
-            'total_machines': total_machines,
-            'active_work_orders': active_work_orders,
-            'upcoming_maintenance': upcoming_maintenance,
-            'low_stock_items': low_stock,
-            'critical_components': critical_components,
-            'overdue_compliance': overdue_compliance
-        }
+        db = get_db()
+        stats = DashboardStats(db).get_stats(max_age=max_age, fresh=bool(fresh), timeout=timeout)
         
         return jsonify({'success': True, 'data': stats}), 200
     except Exception as e:
@@ -60,76 +28,116 @@ def get_maintenance_summary():
     try:
         # Get date range from query params
         days = request.args.get('days', default=30, type=int)
-        start_date = datetime.utcnow() - timedelta(days=days)
+        start = request.args.get('start') or datetime.utcnow() - timedelta(days=days)
+        end = request.args.get('end')
+        group_by = request.args.get('group_by', default='type').split(',')
+        machine_id = request.args.get('machine_id')
+        stream_format = get_stream_format()
         
         db = get_db()
         
-        # Aggregate maintenance history
-        pipeline = [
-            {'$match': {'performed_at': {'$gte': start_date}}},
-            {'$group': {
-                '_id': '$maintenance_type',
-                'count': {'$sum': 1},
-                'total_cost': {'$sum': '$cost'},
-                'total_hours': {'$sum': '$duration_hours'}
-            }}
-        ]
-        
-        summary = list(db['maintenance_history'].aggregate(pipeline))
+        # Aggregate daily rollups instead of raw maintenance history
+        rollup_model = MaintenanceRollup(db)
+        pipeline = rollup_model.build_summary_pipeline(start, end, group_by, machine_id)
+        cursor = rollup_model.collection.aggregate(pipeline, batchSize=STREAM_BATCH_SIZE)
+        if stream_format:
+            return stream_cursor(cursor, stream_format)
+        summary = list(cursor)
         
         return jsonify({'success': True, 'data': summary}), 200
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+HEALTH_WEIGHTS = {
+    'good': 100,
+    'fair': 70,
+    'poor': 40,
+    'critical': 10
+}
+
+def build_machine_health_pipeline(filters=None, skip=0, limit=0):
+    """Pipeline laporan kesehatan mesin dalam satu aggregate"""
+    pipeline = []
+    if filters:
+        pipeline.append({'$match': filters})
+    pipeline.append({'$sort': {'_id': 1}})
+    if skip:
+        pipeline.append({'$skip': skip})
+    if limit:
+        pipeline.append({'$limit': limit})
+
+    weighted_sum = {'$add': [
+        {'$multiply': ['$condition_breakdown.' + condition, weight]}
+        for condition, weight in HEALTH_WEIGHTS.items()
+    ]}
+
+    pipeline += [
+        {'$addFields': {'machine_id': {'$toString': '$_id'}}},
+        {'$lookup': {
+            'from': 'components',
+            'localField': 'machine_id',
+            'foreignField': 'machine_id',
+            'pipeline': [
+                {'$group': {
+                    '_id': {'$ifNull': ['$condition', 'good']},
+                    'count': {'$sum': 1}
+                }}
+            ],
+            'as': 'conditions'
+        }},
+        {'$project': {
+            '_id': 0,
+            'machine_id': 1,
+            'machine_name': '$name',
+            'status': 1,
+            'total_components': {'$sum': '$conditions.count'},
+            'condition_breakdown': {
+                condition: {'$sum': {'$map': {
+                    'input': '$conditions',
+                    'in': {'$cond': [{'$eq': ['$$this._id', condition]}, '$$this.count', 0]}
+                }}}
+                for condition in HEALTH_WEIGHTS
+            }
+        }},
+        {'$addFields': {
+            'health_score': {'$cond': [
+                {'$gt': ['$total_components', 0]},
+                {'$round': [{'$divide': [weighted_sum, '$total_components']}, 2]},
+                100
+            ]}
+        }}
+    ]
+    return pipeline
+
 @report_bp.route('/machine-health', methods=['GET'])
 def get_machine_health():
     """GET status kesehatan semua mesin"""
     try:
+        location = request.args.get('location')
+        status = request.args.get('status')
+        page = request.args.get('page', default=1, type=int)
+        per_page = request.args.get('per_page', default=0, type=int)
+        stream_format = get_stream_format()
+
+        filters = {}
+        if location:
+            filters['location'] = location
+        if status:
+            filters['status'] = status
+
+        skip = (page - 1) * per_page if per_page > 0 and page > 1 else 0
+
         db = get_db()
-        
-        # Get all machines with their components
-        machines = list(db['machines'].find())
-        
-        health_report = []
-        for machine in machines:
-            machine['_id'] = str(machine['_id'])
-            
-            # Get components for this machine
-            components = list(db['components'].find({'machine_id': str(machine['_id'])}))
-            
-            # Count components by condition
-            condition_count = {
-                'good': 0,
-                'fair': 0,
-                'poor': 0,
-                'critical': 0
-            }
-            
-            for comp in components:
-                condition = comp.get('condition', 'good')
-                condition_count[condition] += 1
-            
-            # Calculate health score (0-100)
-            total_components = len(components)
-            if total_components > 0:
-                health_score = (
-                    (condition_count['good'] * 100) +
-                    (condition_count['fair'] * 70) +
-                    (condition_count['poor'] * 40) +
-                    (condition_count['critical'] * 10)
-                ) / total_components
-            else:
-                health_score = 100
-            
-            health_report.append({
-                'machine_id': str(machine['_id']),
-                'machine_name': machine['name'],
-                'health_score': round(health_score, 2),
-                'total_components': total_components,
-                'condition_breakdown': condition_count,
-                'status': machine['status']
-            })
-        
+        pipeline = build_machine_health_pipeline(filters, skip, max(per_page, 0))
+        cursor = db['machines'].aggregate(pipeline, batchSize=STREAM_BATCH_SIZE)
+        if stream_format:
+            return stream_cursor(cursor, stream_format)
+        health_report = list(cursor)
+
         return jsonify({'success': True, 'data': health_report}), 200
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
\ No newline at end of file
@@ -21,10 +21,33 @@ def get_upcoming_schedules():
     """GET jadwal maintenance yang akan datang"""
     try:
         days = request.args.get('days', default=30, type=int)
+        limit = request.args.get('limit', type=int)
+        after = request.args.get('after')
+        fields = request.args.get('fields')
+        
         db = get_db()
         schedule_model = MaintenanceSchedule(db)
-        schedules = schedule_model.get_upcoming_schedules(days)
-        return jsonify({'success': True, 'data': schedules}), 200
+        schedules, next_cursor = schedule_model.get_upcoming_schedules(days, limit, after, fields)
+        return jsonify({'success': True, 'data': schedules, 'next_cursor': next_cursor}), 200
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@schedule_bp.route('/overdue', methods=['GET'])
+def get_overdue_schedules():
+    """GET jadwal maintenance yang overdue"""
+    try:
+        limit = request.args.get('limit', type=int)
+        after = request.args.get('after')
+        fields = request.args.get('fields')
+        
+        db = get_db()
+        schedule_model = MaintenanceSchedule(db)
+        schedules, next_cursor = schedule_model.get_overdue_schedules(limit, after, fields)
+        return jsonify({'success': True, 'data': schedules, 'next_cursor': next_cursor}), 200
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -0,0 +1,61 @@
+from flask import Blueprint, request, jsonify
+from database import get_db
+from fanout import run_parallel
+from models.component import Component
+from models.maintenance_history import MaintenanceHistory
+from models.work_order import WorkOrder
+from text_search import normalize_query, parse_page
+
+search_bp = Blueprint('search', __name__, url_prefix='/api/search')
+
+SEARCH_TYPES = {
+    'work_orders': WorkOrder,
+    'history': MaintenanceHistory,
+    'components': Component
+}
+
+@search_bp.route('/', methods=['GET'])
+def search():
+    """GET pencarian full-text di work orders, history dan komponen"""
+    try:
+        q = normalize_query(request.args.get('q'))
+        skip, per_page = parse_page(
+            request.args.get('page', default=1, type=int),
+            request.args.get('per_page', type=int)
+        )
+        types = request.args.get('types')
+        types = [t.strip() for t in types.split(',') if t.strip()] if types else list(SEARCH_TYPES)
+        unknown = [t for t in types if t not in SEARCH_TYPES]
+        if unknown:
+            return jsonify({'success': False, 'error': 'Unknown search types: ' + ', '.join(unknown)}), 400
+        
+        filters = {}
+        machine_id = request.args.get('machine_id')
+        if machine_id:
+            filters['machine_id'] = machine_id
+        
+        db = get_db()
+        queries = {}
+        for search_type in types:
+            model = SEARCH_TYPES[search_type](db)
+            type_filters = dict(filters)
+            if search_type == 'work_orders' and request.args.get('status'):
+                type_filters['status'] = request.args.get('status')
+            queries[search_type] = (
+                lambda model=model, type_filters=type_filters: model.search(q, type_filters, skip, per_page)
+            )
+        
+        # One text query per collection, run side by side
+        results, errors = run_parallel(queries)
+        data = {
+            search_type: {'results': documents, 'has_more': has_more}
+            for search_type, (documents, has_more) in results.items()
+        }
+        response = {'success': True, 'data': data, 'page': skip // per_page + 1, 'per_page': per_page}
+        if errors:
+            response['errors'] = errors
+        return jsonify(response), 200
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
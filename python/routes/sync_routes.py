@@ -0,0 +1,24 @@
+from flask import Blueprint, request, jsonify
+from database import get_db
+from sync_feed import ResyncRequired, get_changes
+
+sync_bp = Blueprint('sync', __name__, url_prefix='/api/sync')
+
+@sync_bp.route('', methods=['GET'])
+@sync_bp.route('/', methods=['GET'])
+def get_sync_changes():
+    """GET perubahan sejak token since (dibuat, diubah, dihapus)"""
+    try:
+        since = request.args.get('since')
+        collections = request.args.get('collections')
+        limit = request.args.get('limit', type=int)
+        
+        db = get_db()
+        changes = get_changes(db, since, collections, limit)
+        return jsonify({'success': True, **changes}), 200
+    except ResyncRequired as e:
+        return jsonify({'success': False, 'error': str(e), 'resync': True}), 410
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
@@ -1,6 +1,8 @@
 from flask import Blueprint, request, jsonify
 from models.work_order import WorkOrder
 from database import get_db
+from streaming import get_stream_format, stream_cursor
+from conditional import collection_validators, conditional_response, make_etag
 
 work_order_bp = Blueprint('work_orders', __name__, url_prefix='/api/work-orders')
 
@@ -21,10 +23,24 @@ def get_all_work_orders():
         if machine_id:
             filters['machine_id'] = machine_id
         
+        limit = request.args.get('limit', type=int)
+        after = request.args.get('after')
+        fields = request.args.get('fields')
+        stream_format = get_stream_format()
+        
         db = get_db()
         wo_model = WorkOrder(db)
-        work_orders = wo_model.get_all_work_orders(filters)
-        return jsonify({'success': True, 'data': work_orders}), 200
+        if stream_format:
+            return stream_cursor(wo_model.iter_work_orders(filters, fields), stream_format)
+        etag, last_modified = collection_validators(wo_model.collection)
+        
+        def build():
+            work_orders, next_cursor = wo_model.get_all_work_orders(filters, limit, after, fields)
+            return jsonify({'success': True, 'data': work_orders, 'next_cursor': next_cursor})
+        
+        return conditional_response(etag, last_modified, build)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -46,10 +62,15 @@ def get_work_order(work_order_id):
     try:
         db = get_db()
         wo_model = WorkOrder(db)
-        work_order = wo_model.get_work_order_by_id(work_order_id)
-        if work_order:
-            return jsonify({'success': True, 'data': work_order}), 200
-        return jsonify({'success': False, 'error': 'Work order not found'}), 404
+        found, updated_at = wo_model.get_work_order_version(work_order_id)
+        if not found:
+            return jsonify({'success': False, 'error': 'Work order not found'}), 404
+        
+        def build():
+            # The probed version lets a cache hit skip the second probe
+            return jsonify({'success': True, 'data': wo_model.get_work_order_by_id(work_order_id, updated_at)})
+        
+        return conditional_response(make_etag(work_order_id, updated_at), updated_at, build)
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
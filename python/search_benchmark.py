@@ -0,0 +1,118 @@
+"""Benchmark latency pencarian full-text pada data sintetis
+
+Mengisi database terpisah (default hyundai_cmms_bench, bukan database
+aplikasi) dengan work order, history dan komponen sintetis, membangun
+index yang dideklarasikan model, lalu mengukur latency setiap query.
+
+Contoh:
+    python search_benchmark.py --docs 1000000
+    python search_benchmark.py --skip-seed --runs 50 --query "hydraulic leak" --query HX-10
+"""
+import argparse
+from datetime import datetime, timedelta
+import os
+import random
+import time
+from pymongo import MongoClient
+from indexes import sync_indexes
+from models.component import Component
+from models.maintenance_history import MaintenanceHistory
+from models.work_order import WorkOrder
+
+WORDS = (
+    'hydraulic leak pump motor bearing belt conveyor welding robot spindle coolant '
+    'valve sensor overheating vibration noise alignment calibration lubrication seal '
+    'gasket pressure filter replacement inspection fault electrical wiring controller '
+    'servo gearbox chain hose cylinder nozzle paint press stamping torque'
+).split()
+DEFAULT_QUERIES = ['hydraulic leak', 'bearing vibration', 'servo', 'HX-10', 'coolant pump overheating']
+
+
+def _sentence(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words))
+
+
+def seed(db, total, batch_size=10000):
+    """Isi koleksi dengan total dokumen per koleksi"""
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    for name in (WorkOrder.COLLECTION, MaintenanceHistory.COLLECTION, Component.COLLECTION):
+        db[name].drop()
+
+    for start in range(0, total, batch_size):
+        count = min(batch_size, total - start)
+        machine_ids = [f'machine-{rng.randrange(500)}' for _ in range(count)]
+        db[WorkOrder.COLLECTION].insert_many([{
+            'order_number': f'WO-{start + i}',
+            'machine_id': machine_ids[i],
+            'title': _sentence(rng, 4),
+            'description': _sentence(rng, 20),
+            'status': rng.choice(['pending', 'in_progress', 'completed']),
+            'notes': [{'content': _sentence(rng, 8), 'author': 'bench', 'timestamp': now}],
+            'created_at': now - timedelta(minutes=start + i),
+            'updated_at': now
+        } for i in range(count)], ordered=False)
+        db[MaintenanceHistory.COLLECTION].insert_many([{
+            'machine_id': machine_ids[i],
+            'maintenance_type': rng.choice(['preventive', 'corrective']),
+            'title': _sentence(rng, 4),
+            'description': _sentence(rng, 20),
+            'notes': _sentence(rng, 8),
+            'performed_at': now - timedelta(minutes=start + i),
+            'created_at': now
+        } for i in range(count)], ordered=False)
+        db[Component.COLLECTION].insert_many([{
+            'machine_id': machine_ids[i],
+            'name': _sentence(rng, 3),
+            'part_number': f'HX-{start + i:07d}',
+            'condition': rng.choice(['good', 'fair', 'poor', 'critical']),
+            'condition_history': [],
+            'updated_at': now
+        } for i in range(count)], ordered=False)
+        print(f'Seeded {start + count}/{total}', flush=True)
+
+
+def benchmark(db, queries, runs):
+    models = {
+        'work_orders': WorkOrder(db),
+        'history': MaintenanceHistory(db),
+        'components': Component(db)
+    }
+    for q in queries:
+        for name, model in models.items():
+            timings = []
+            for _ in range(runs):
+                started = time.perf_counter()
+                model.search(q, limit=20)
+                timings.append((time.perf_counter() - started) * 1000)
+            timings.sort()
+            print(
+                f'{name:12s} {q!r:28s} p50={timings[len(timings) // 2]:.1f}ms '
+                f'p95={timings[min(int(len(timings) * 0.95), len(timings) - 1)]:.1f}ms'
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--docs', type=int, default=1000000, help='Documents per collection')
+    parser.add_argument('--database', default='hyundai_cmms_bench')
+    parser.add_argument('--skip-seed', action='store_true')
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--query', action='append', dest='queries')
+    args = parser.parse_args()
+
+    if not args.skip_seed and args.database == os.getenv('MONGODB_DB', 'hyundai_cmms'):
+        parser.error('refusing to seed the application database')
+
+    client = MongoClient(os.getenv('MONGODB_URI', 'mongodb://mongodb:27017/'))
+    db = client[args.database]
+    if not args.skip_seed:
+        seed(db, args.docs)
+    started = time.perf_counter()
+    sync_indexes(db)
+    print(f'Indexes ready in {time.perf_counter() - started:.1f}s')
+    benchmark(db, args.queries or DEFAULT_QUERIES, args.runs)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,174 @@
+import os
+import queue
+import threading
+from flask import json
+from events import subscribe
+from metrics import Counter, Gauge
+from models.event_log import EventLog
+
+MAX_CLIENTS = int(os.getenv('SSE_MAX_CLIENTS', '500'))
+# Per-connection memory bound: a client that falls this many events behind
+# is disconnected and resumes with Last-Event-ID instead of buffering forever
+QUEUE_SIZE = int(os.getenv('SSE_QUEUE_SIZE', '100'))
+HEARTBEAT_SECONDS = float(os.getenv('SSE_HEARTBEAT_SECONDS', '15'))
+# A stream holds its worker thread until the client leaves. Thread-based
+# gunicorn workers (sync, gthread) call limit_to_threads from
+# post_worker_init so streams always leave one thread for the REST API;
+# gevent and asgi workers are bounded by SSE_MAX_CLIENTS only.
+_stream_slots = None
+
+EVENT_TYPES = (
+    'machine.status',
+    'work_order.status',
+    'inventory.low_stock',
+    'schedule.overdue',
+    'compliance.overdue'
+)
+
+_clients = set()
+_clients_lock = threading.Lock()
+
+events_sent = Counter('cmms_sse_events_sent_total', 'Events queued to SSE clients', ('type',))
+clients_dropped = Counter('cmms_sse_clients_dropped_total', 'SSE clients disconnected for falling behind')
+Gauge('cmms_sse_clients', 'Connected SSE clients', callback=lambda: [((), len(_clients))])
+
+
+class TooManyClients(Exception):
+    """Batas koneksi SSE worker ini tercapai"""
+
+
+def limit_to_threads(threads):
+    """Batasi stream SSE per worker ke threads - 1"""
+    global _stream_slots
+    _stream_slots = max(threads - 1, 0)
+
+
+def max_clients():
+    if _stream_slots is None:
+        return MAX_CLIENTS
+    return min(MAX_CLIENTS, _stream_slots)
+
+
+class Client:
+    """Satu koneksi SSE dengan antrean terbatas"""
+
+    __slots__ = ('queue', 'types', 'overflowed')
+
+    def __init__(self, types):
+        self.queue = queue.Queue(maxsize=QUEUE_SIZE)
+        self.types = types
+        self.overflowed = False
+
+    def wants(self, event_type):
+        return not self.types or any(event_type.startswith(prefix) for prefix in self.types)
+
+
+@subscribe
+def _dispatch(event):
+    # Runs on the event-log tail thread; never block on a slow client
+    with _clients_lock:
+        clients = list(_clients)
+    for client in clients:
+        if client.overflowed or not client.wants(event['type']):
+            continue
+        try:
+            client.queue.put_nowait(event)
+            events_sent.inc((event['type'],))
+        except queue.Full:
+            client.overflowed = True
+            clients_dropped.inc()
+
+
+def parse_types(types):
+    """Ubah types=a,b menjadi daftar prefix tipe event"""
+    if not types:
+        return ()
+    return tuple(prefix.strip() for prefix in types.split(',') if prefix.strip())
+
+
+def _format(event):
+    return 'id: %s\nevent: %s\ndata: %s\n\n' % (
+        event['_id'], event['type'], json.dumps(event.get('payload'))
+    )
+
+
+def parse_last_event_id(value):
+    """Ubah header Last-Event-ID menjadi ID event, ValueError jika tidak valid"""
+    if value in (None, ''):
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError('Invalid Last-Event-ID')
+
+
+def open_stream(db, types=(), last_event_id=None):
+    """Daftarkan klien baru dan kembalikan generator pesan SSE
+
+    Event setelah last_event_id diputar ulang dari event log sebelum event
+    live, paling banyak QUEUE_SIZE; lebih dari itu diakhiri event overflow
+    dan klien menyambung ulang dari sana. Event resync dikirim jika
+    last_event_id lebih tua dari event tertua di log. Raise TooManyClients
+    jika batas koneksi tercapai.
+    """
+    limit = max_clients()
+    if limit == 0:
+        raise TooManyClients('Event streams need a gevent or asgi worker, this worker has no spare thread')
+    if len(_clients) >= limit:
+        raise TooManyClients(f'SSE client limit of {limit} reached')
+    client = Client(types)
+
+    def generate():
+        # Registered on first iteration so a response that is never
+        # started cannot leak a client
+        with _clients_lock:
+            _clients.add(client)
+        try:
+            # Tell EventSource how long to wait before reconnecting
+            yield 'retry: 3000\n\n'
+            # The client is registered before the replay query, so events
+            # written in between are queued and deduplicated below
+            replay = []
+            if last_event_id is not None:
+                event_log = EventLog(db)
+                oldest_id = event_log.get_oldest_id()
+                if oldest_id is not None and last_event_id + 1 < oldest_id:
+                    # Events after Last-Event-ID already rolled out of the
+                    # capped log, the client has to reload its state. A gap
+                    # further on is an ID whose write failed, not a loss.
+                    yield 'event: resync\ndata: {}\n\n'
+                # Ordered by _id, not insertion order
+                replay = event_log.get_events_after(last_event_id, QUEUE_SIZE + 1)
+            last_id = None
+            replayed = set()
+            for event in replay[:QUEUE_SIZE]:
+                if client.wants(event['type']):
+                    yield _format(event)
+                last_id = event['_id']
+                replayed.add(last_id)
+            if len(replay) > QUEUE_SIZE:
+                # Too far behind to replay in one go: the id moves the
+                # client's Last-Event-ID so the reconnect continues from here
+                yield 'id: %s\nevent: overflow\ndata: {}\n\n' % last_id
+                return
+            while True:
+                if client.overflowed:
+                    yield 'event: overflow\ndata: {}\n\n'
+                    return
+                try:
+                    event = client.queue.get(timeout=HEARTBEAT_SECONDS)
+                except queue.Empty:
+                    # Comment line keeps proxies open and detects gone clients
+                    yield ': heartbeat\n\n'
+                    continue
+                # IDs are allocated before insert, so an event committed
+                # late can carry a lower ID than the replay; only skip the
+                # ones actually sent
+                if event['_id'] in replayed:
+                    continue
+                yield _format(event)
+        finally:
+            with _clients_lock:
+                _clients.discard(client)
+
+    return generate()
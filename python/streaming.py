@@ -0,0 +1,46 @@
+from flask import Response, json, request, stream_with_context
+
+STREAM_BATCH_SIZE = 500
+STREAM_FORMATS = ('ndjson', 'json')
+
+
+def get_stream_format():
+    """Format streaming yang diminta (ndjson/json) atau None"""
+    stream = request.args.get('stream')
+    if stream:
+        if stream not in STREAM_FORMATS:
+            raise ValueError('stream must be one of: ' + ', '.join(STREAM_FORMATS))
+        return stream
+    if request.accept_mimetypes.best == 'application/x-ndjson':
+        return 'ndjson'
+    return None
+
+
+def _encode(doc):
+    return json.dumps(doc)
+
+
+def _ndjson_rows(cursor):
+    for doc in cursor:
+        yield _encode(doc) + '\n'
+
+
+def _json_array_rows(cursor):
+    yield '{"success": true, "data": ['
+    first = True
+    for doc in cursor:
+        if first:
+            first = False
+            yield _encode(doc)
+        else:
+            yield ',' + _encode(doc)
+    yield ']}'
+
+
+def stream_cursor(cursor, stream_format):
+    """Kirim hasil cursor baris demi baris tanpa menampung seluruh data"""
+    if stream_format == 'ndjson':
+        rows, mimetype = _ndjson_rows(cursor), 'application/x-ndjson'
+    else:
+        rows, mimetype = _json_array_rows(cursor), 'application/json'
+    return Response(stream_with_context(rows), mimetype=mimetype)
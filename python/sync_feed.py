@@ -0,0 +1,143 @@
+import base64
+from datetime import datetime, timedelta
+import os
+from bson import json_util
+from database import read_collection
+from models.component import LIST_PROJECTION as COMPONENT_LIST_PROJECTION, Component
+from models.machine import LIST_PROJECTION as MACHINE_LIST_PROJECTION, Machine
+from models.tombstone import RETENTION_SECONDS, Tombstone
+from models.work_order import LIST_PROJECTION as WORK_ORDER_LIST_PROJECTION, WorkOrder
+
+DEFAULT_LIMIT = 200
+MAX_LIMIT = 1000
+# updated_at is stamped by the app before the write commits, so a slower
+# writer can commit an older timestamp after a reader has passed it. Only
+# changes older than this lag are served; newer ones arrive on the next poll.
+LAG_SECONDS = float(os.getenv('SYNC_LAG_SECONDS', '2'))
+
+SYNC_COLLECTIONS = {
+    Machine.COLLECTION: MACHINE_LIST_PROJECTION,
+    WorkOrder.COLLECTION: WORK_ORDER_LIST_PROJECTION,
+    Component.COLLECTION: COMPONENT_LIST_PROJECTION
+}
+TOMBSTONE_KEY = 'deleted'
+
+
+class ResyncRequired(Exception):
+    """Token sync sudah lebih tua dari retensi tombstone"""
+
+
+def encode_token(positions, issued_at):
+    raw = json_util.dumps({'v': 1, 'issued_at': issued_at, 'positions': positions}).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_token(token):
+    """Baca token sync, ValueError jika tidak valid"""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        data = json_util.loads(raw)
+        positions = data['positions']
+        issued_at = data['issued_at']
+    except Exception:
+        raise ValueError('Invalid sync token')
+    if not isinstance(positions, dict) or not isinstance(issued_at, datetime):
+        raise ValueError('Invalid sync token')
+    # json_util returns aware datetimes; stored timestamps are naive UTC
+    return positions, issued_at.replace(tzinfo=None)
+
+
+def parse_collections(collections):
+    """Ubah collections=a,b menjadi daftar koleksi sync yang valid"""
+    if not collections:
+        return list(SYNC_COLLECTIONS)
+    names = [name.strip() for name in collections.split(',') if name.strip()]
+    unknown = [name for name in names if name not in SYNC_COLLECTIONS]
+    if unknown:
+        raise ValueError('Unknown sync collections: ' + ', '.join(unknown))
+    return names
+
+
+def changes_query(time_field, position, horizon, query=None):
+    """Filter (time_field, _id) setelah position sampai horizon"""
+    conditions = [{time_field: {'$lte': horizon}}]
+    if query:
+        conditions.append(query)
+    if position:
+        value, last_id = position
+        conditions.append({'$or': [
+            {time_field: {'$gt': value}},
+            {time_field: value, '_id': {'$gt': last_id}}
+        ]})
+    return {'$and': conditions}
+
+
+def _changes(collection, time_field, position, horizon, limit, projection=None, query=None):
+    """Dokumen dengan (time_field, _id) setelah position sampai horizon"""
+    cursor = read_collection(collection).find(changes_query(time_field, position, horizon, query), projection)
+    documents = list(cursor.sort([(time_field, 1), ('_id', 1)]).limit(limit + 1))
+
+    has_more = len(documents) > limit
+    documents = documents[:limit]
+    if documents:
+        position = [documents[-1][time_field], documents[-1]['_id']]
+    return documents, position, has_more
+
+
+def get_changes(db, since=None, collections=None, limit=None):
+    """Perubahan sejak token since untuk koleksi yang diminta
+
+    Mengembalikan dict berisi dokumen yang dibuat/diubah per koleksi,
+    daftar penghapusan, next_token dan has_more. Tanpa since, feed dimulai
+    dari awal (snapshot penuh per halaman).
+    """
+    limit = min(limit, MAX_LIMIT) if limit and limit > 0 else DEFAULT_LIMIT
+    names = parse_collections(collections)
+    now = datetime.utcnow()
+    horizon = now - timedelta(seconds=LAG_SECONDS)
+
+    positions = {}
+    issued_at = None
+    if since:
+        positions, issued_at = decode_token(since)
+        if issued_at < now - timedelta(seconds=RETENTION_SECONDS):
+            raise ResyncRequired('Sync token is older than the tombstone retention, resync from scratch')
+
+    data = {}
+    has_more = False
+    for name in names:
+        documents, positions[name], more = _changes(
+            db[name], 'updated_at', positions.get(name), horizon, limit, SYNC_COLLECTIONS[name]
+        )
+        data[name] = documents
+        has_more = has_more or more
+
+    deleted = []
+    if since:
+        # A fresh client has nothing to delete, it only needs the position
+        tombstones, positions[TOMBSTONE_KEY], more = _changes(
+            db[Tombstone.COLLECTION], 'deleted_at', positions.get(TOMBSTONE_KEY), horizon, limit,
+            query={'collection': {'$in': names}}
+        )
+        deleted = [{
+            'collection': tombstone['collection'],
+            'id': tombstone['entity_id'],
+            'deleted_at': tombstone['deleted_at']
+        } for tombstone in tombstones]
+        has_more = has_more or more
+    elif TOMBSTONE_KEY not in positions:
+        latest = db[Tombstone.COLLECTION].find_one(
+            {'deleted_at': {'$lte': horizon}}, sort=[('deleted_at', -1), ('_id', -1)]
+        )
+        positions[TOMBSTONE_KEY] = [latest['deleted_at'], latest['_id']] if latest else None
+    data[TOMBSTONE_KEY] = deleted
+
+    # While paging, keep the original issue time so retention is measured
+    # from the oldest change the client may still be missing
+    if issued_at is None or not has_more:
+        issued_at = horizon
+    return {
+        'data': data,
+        'next_token': encode_token(positions, issued_at),
+        'has_more': has_more
+    }
@@ -0,0 +1,87 @@
+import os
+import re
+
+DEFAULT_PER_PAGE = 20
+MAX_PER_PAGE = 100
+# Deep pages of a relevance ranking cost a full sort of every match
+MAX_SKIP = int(os.getenv('SEARCH_MAX_SKIP', '1000'))
+TEXT_LANGUAGE = os.getenv('TEXT_SEARCH_LANGUAGE', 'english')
+# Ranks exact part-number prefix hits above any text relevance score
+PREFIX_SCORE = 1000.0
+# Shorter queries match too much of the prefix index to be worth scanning
+MIN_PREFIX_LENGTH = int(os.getenv('SEARCH_MIN_PREFIX_LENGTH', '3'))
+
+SCORE_SORT = [('score', {'$meta': 'textScore'}), ('_id', 1)]
+
+
+def parse_page(page, per_page):
+    """Ubah page/per_page menjadi (skip, limit), ValueError jika terlalu dalam"""
+    per_page = min(per_page, MAX_PER_PAGE) if per_page and per_page > 0 else DEFAULT_PER_PAGE
+    page = page if page and page > 0 else 1
+    skip = (page - 1) * per_page
+    if skip > MAX_SKIP:
+        raise ValueError(f'Search results are limited to the first {MAX_SKIP + per_page} matches, refine the query')
+    return skip, per_page
+
+
+def normalize_query(q):
+    """Rapikan teks pencarian, ValueError jika kosong"""
+    q = ' '.join((q or '').split())
+    if not q:
+        raise ValueError('Search query q is required')
+    if len(q) > 200:
+        raise ValueError('Search query is too long')
+    return q
+
+
+def split_page(documents, limit):
+    """Potong hasil yang diambil limit + 1, mengembalikan (documents, has_more)"""
+    return documents[:limit], len(documents) > limit
+
+
+def text_search(collection, q, filters=None, projection=None, skip=0, limit=DEFAULT_PER_PAGE):
+    """Cari dengan text index, diurutkan dari skor relevansi tertinggi"""
+    query = dict(filters or {}, **{'$text': {'$search': q}})
+    projection = dict(projection or {}, score={'$meta': 'textScore'})
+    cursor = collection.find(query, projection).sort(SCORE_SORT).skip(skip).limit(limit + 1)
+    return split_page(list(cursor), limit)
+
+
+def prefix_text_search(collection, q, prefix_field, filters=None, skip=0, limit=DEFAULT_PER_PAGE, stages=None):
+    """Text search digabung dengan pencocokan prefix pada prefix_field
+
+    Dokumen yang prefix_field-nya diawali q mendapat PREFIX_SCORE sehingga
+    selalu di atas hasil text search. Prefix memakai index biasa pada field
+    (case-sensitive) dan hanya untuk q minimal MIN_PREFIX_LENGTH karakter.
+    stages ditambahkan setelah $limit, misalnya untuk memangkas array.
+    """
+    text_match = dict(filters or {}, **{'$text': {'$search': q}})
+    pipeline = [
+        {'$match': text_match},
+        {'$addFields': {'score': {'$meta': 'textScore'}}},
+        # Like the prefix branch, only the top skip + limit + 1 text hits can
+        # reach the page, so the merge below never sorts every text match
+        {'$sort': {'score': -1, '_id': 1}},
+        {'$limit': skip + limit + 1}
+    ]
+    if len(q) >= MIN_PREFIX_LENGTH:
+        prefix_match = dict(filters or {}, **{prefix_field: {'$regex': '^' + re.escape(q)}})
+        pipeline.append({'$unionWith': {'coll': collection.name, 'pipeline': [
+            {'$match': prefix_match},
+            # Prefix hits all share PREFIX_SCORE and rank by _id, so only the
+            # first skip + limit + 1 of them can reach the page
+            {'$sort': {'_id': 1}},
+            {'$limit': skip + limit + 1},
+            {'$addFields': {'score': PREFIX_SCORE}}
+        ]}})
+    pipeline += [
+        {'$sort': {'score': -1, '_id': 1}},
+        # A document can match both ways, keep its best score
+        {'$group': {'_id': '$_id', 'doc': {'$first': '$$ROOT'}}},
+        {'$replaceRoot': {'newRoot': '$doc'}},
+        {'$sort': {'score': -1, '_id': 1}},
+        {'$skip': skip},
+        {'$limit': limit + 1}
+    ]
+    pipeline += stages or []
+    return split_page(list(collection.aggregate(pipeline)), limit)
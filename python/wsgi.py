@@ -0,0 +1,4 @@
+"""WSGI entry point untuk gunicorn: gunicorn -c gunicorn_config.py wsgi:app"""
+from app import create_app
+
+app = create_app()